@@ -2,51 +2,99 @@
 Fichier de définition des routes API pour la gestion d'une session de jeu
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from db.database import get_database
-from services import game_service
-from db.schemas import GameCreate, GameRead, RollRequest, ChooseScoreRequest
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.database import get_async_database
+from services import game_service, solver
+from db.schemas import GameCreate, GameRead, GameSummary, Hint, RollRequest, ChooseScoreRequest
+from services.game_cache import CachedGame
+from utils import state_codec
+from utils.utils import NEXT_CURSOR_HEADER, encode_cursor
 
 game_router = APIRouter()
 
 
+def _game_response(request: Request, game: CachedGame):
+    """
+    Réponse d'une route de partie : `GameRead` en JSON, ou l'état seul au format compact
+    si le client l'annonce dans `Accept`.
+    """
+    if state_codec.STATE_MEDIA_TYPE in request.headers.get("accept", ""):
+        return Response(state_codec.encode_dict(game.state), media_type=state_codec.STATE_MEDIA_TYPE)
+    return game
+
+
 @game_router.post("/start", response_model=GameRead)
-def start_game(payload: GameCreate, db: Session = Depends(get_database)):
+async def start_game(payload: GameCreate, db: AsyncSession = Depends(get_async_database)):
     try:
-        game = game_service.Game(db)
-        return game.start(payload.user_id)
+        game = game_service.AsyncGame(db)
+        return await game.start(payload.user_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
 @game_router.post("/{game_id}/roll", response_model=GameRead)
-def roll(game_id: int, payload: RollRequest, db: Session = Depends(get_database)):
+async def roll(game_id: int, payload: RollRequest, request: Request, db: AsyncSession = Depends(get_async_database)):
     try:
-        game = game_service.Game(db, game_id)
-        return game.roll(payload.locked_dice)
+        game = game_service.AsyncGame(db, game_id)
+        return _game_response(request, await game.roll(payload.locked_dice))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except BufferError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 
 @game_router.post("/{game_id}/score", response_model=GameRead)
-def choose_score(game_id: int, payload: ChooseScoreRequest, db: Session = Depends(get_database)):
+async def choose_score(
+    game_id: int, payload: ChooseScoreRequest, request: Request, db: AsyncSession = Depends(get_async_database)
+):
     try:
-        game = game_service.Game(db, game_id)
-        return game.choose_score(payload.category)
+        game = game_service.AsyncGame(db, game_id)
+        return _game_response(request, await game.choose_score(payload.category))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except BufferError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
 
 @game_router.get("/{game_id}", response_model=GameRead)
-def get_game(game_id: int, db: Session = Depends(get_database)):
+async def get_game(game_id: int, request: Request, db: AsyncSession = Depends(get_async_database)):
     try:
-        game = game_service.Game(db, game_id)
-        return game.get()
+        game = game_service.AsyncGame(db, game_id)
+        return _game_response(request, await game.get())
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@game_router.get("/user/{user_id}", response_model=list[GameRead])
-def list_games(user_id: int, db: Session = Depends(get_database)):
-    return game_service.Game.list_for_user(db, user_id)
+@game_router.get("/{game_id}/hint", response_model=Hint)
+async def get_hint(game_id: int, db: AsyncSession = Depends(get_async_database)):
+    try:
+        state = await game_service.AsyncGame(db, game_id).get_state()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    try:
+        return solver.get_solver().best_action(state)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@game_router.get("/user/{user_id}", response_model=list[GameSummary])
+async def list_games(
+    user_id: int,
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    finished: Optional[int] = Query(None, ge=0, le=1),
+    include_state: bool = False,
+    db: AsyncSession = Depends(get_async_database),
+):
+    try:
+        games = await game_service.AsyncGame.list_for_user(
+            db, user_id, limit=limit, cursor=cursor, finished=finished, include_state=include_state
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(games) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(games[-1].created_at, games[-1].id)
+    return games
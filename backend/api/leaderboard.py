@@ -0,0 +1,59 @@
+"""
+Fichier de définition des routes API des classements
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import get_async_database
+from db.schemas import GameRank, LeaderboardEntry, ScoreRank, UserStats
+from services import leaderboard_service
+from services.leaderboard_service import leaderboard
+
+leaderboard_router = APIRouter(prefix="/leaderboard")
+
+
+@leaderboard_router.get("", response_model=list[LeaderboardEntry])
+async def get_top_games(limit: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_async_database)):
+    games = leaderboard.top_games(limit)
+    names = await leaderboard_service.usernames_async(db, list({game["user_id"] for game in games}))
+    return [{**game, "username": names.get(game["user_id"])} for game in games]
+
+
+@leaderboard_router.get("/users", response_model=list[UserStats])
+async def get_top_users(limit: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_async_database)):
+    users = leaderboard.top_users(limit)
+    names = await leaderboard_service.usernames_async(db, [stats["user_id"] for stats in users])
+    return [{**stats, "username": names.get(stats["user_id"])} for stats in users]
+
+
+@leaderboard_router.get("/rank", response_model=ScoreRank)
+async def get_score_rank(score: int = Query(..., ge=0)):
+    rank, total = leaderboard.rank_of_score(score)
+    return {"total_score": score, "rank": rank, "total": total}
+
+
+@leaderboard_router.get("/user/{user_id}", response_model=UserStats)
+async def get_user_stats(user_id: int, db: AsyncSession = Depends(get_async_database)):
+    stats = leaderboard.user_stats(user_id)
+    if stats is None:
+        raise HTTPException(status_code=404, detail="No finished game for this user")
+    names = await leaderboard_service.usernames_async(db, [user_id])
+    return {**stats, "username": names.get(user_id)}
+
+
+@leaderboard_router.get("/user/{user_id}/games", response_model=list[LeaderboardEntry])
+async def get_user_top_games(
+    user_id: int, limit: int = Query(10, ge=1, le=100), db: AsyncSession = Depends(get_async_database)
+):
+    return await leaderboard_service.top_games_async(db, limit, user_id)
+
+
+@leaderboard_router.get("/game/{game_id}", response_model=GameRank)
+async def get_game_rank(game_id: int, db: AsyncSession = Depends(get_async_database)):
+    try:
+        total_score = await leaderboard_service.game_score_async(db, game_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    rank, total = leaderboard.rank_of_score(total_score)
+    return {"game_id": game_id, "total_score": total_score, "rank": rank, "total": total}
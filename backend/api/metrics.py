@@ -0,0 +1,59 @@
+"""
+Fichier de définition de l'endpoint `/metrics` (format texte Prometheus) et du middleware de mesure des requêtes
+"""
+
+import time
+
+from fastapi import APIRouter, Response
+
+from utils import metrics
+
+metrics_router = APIRouter()
+
+# Méthodes gardées telles quelles en étiquette ; les autres (choisies par le client) sont regroupées sous `OTHER`
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return Response(metrics.render(), media_type=metrics.PROMETHEUS_MEDIA_TYPE)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI qui mesure chaque requête HTTP : durée, nombre de requêtes SQL et temps passé en base.
+
+    Les séries sont étiquetées par le modèle de chemin de la route (`/{game_id}/roll`) et non par le chemin
+    demandé, pour un nombre de séries borné ; les requêtes sans route sont regroupées sous `unmatched`,
+    et les méthodes HTTP non standard sous `OTHER`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        stats = metrics.QueryStats()
+        token = metrics.current_query_stats.set(stats)
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            metrics.current_query_stats.reset(token)
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"] if scope["method"] in HTTP_METHODS else "OTHER"
+            metrics.http_request_duration.observe(duration, method, route, str(status))
+            metrics.http_request_db_queries.observe(stats.count, method, route)
+            metrics.http_request_db_duration.observe(stats.duration, method, route)
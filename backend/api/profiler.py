@@ -0,0 +1,140 @@
+"""
+Fichier de définition du profilage à chaud (activé par `PROFILER_ENABLED`) : une requête via l'en-tête
+`X-Profile`, ou tout le processus pendant une fenêtre via `/debug/profile`
+"""
+
+from typing import Optional
+import asyncio
+import cProfile
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from starlette.responses import PlainTextResponse
+
+from core.config import settings
+from utils import profiler
+
+# En-têtes de la requête : format du profil demandé et jeton d'accès
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+# En-tête de la réponse : statut de la réponse remplacée par le profil
+PROFILE_STATUS_HEADER = "X-Profile-Status"
+# Durée maximale d'une fenêtre de profilage, en secondes
+MAX_WINDOW = 60.0
+
+profiler_router = APIRouter()
+
+
+def token_allowed(token: Optional[str]) -> bool:
+    """
+    Vérifie le jeton de profilage. Sans `PROFILER_TOKEN` (refusé au démarrage si le profilage est activé),
+    tout jeton est refusé.
+    """
+    if not settings.profiler_token:
+        return False
+    return hmac.compare_digest((token or "").encode(), settings.profiler_token.encode())
+
+
+@profiler_router.get("/debug/profile", include_in_schema=False)
+async def profile_window(
+    seconds: float = Query(5.0, gt=0, le=MAX_WINDOW),
+    format: str = Query("collapsed"),
+    interval: float = Query(0.005, ge=0.001, le=1.0),
+    token: Optional[str] = Header(None, alias=PROFILE_TOKEN_HEADER),
+):
+    """
+    Profile le processus pendant `seconds` secondes : échantillonnage des piles de tous les threads
+    (format `collapsed`), ou cProfile du thread de la boucle d'événements (formats `pstats` et `text`).
+    """
+    if not token_allowed(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+    if format not in profiler.PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unknown format, expected one of {list(profiler.PROFILE_FORMATS)}")
+    if not profiler.profiling_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    try:
+        if format == "collapsed":
+            sampler = profiler.StackSampler(interval)
+            sampler.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                sampler.stop()
+            content = sampler.collapsed()
+        else:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profile.disable()
+            content = profiler.pstats_report(profile, format)
+    finally:
+        profiler.profiling_lock.release()
+    return Response(content, media_type=profiler.PROFILE_MEDIA_TYPES[format])
+
+
+class ProfilerMiddleware:
+    """
+    Middleware ASGI qui profile une requête portant l'en-tête `X-Profile: pstats|text|collapsed` et renvoie
+    le profil à la place du corps de la réponse (statut d'origine dans `X-Profile-Status`).
+
+    cProfile ne couvre que le thread de la boucle d'événements (routes asynchrones et appels `run_sync`) ;
+    l'échantillonnage couvre aussi les threads du pilote SQLite et de `to_thread`. Dans les deux cas,
+    les autres requêtes traitées en même temps apparaissent aussi dans le profil.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        fmt = None
+        if scope["type"] == "http":
+            fmt = next((value for name, value in scope["headers"] if name == b"x-profile"), None)
+        if fmt is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        fmt = fmt.decode("latin-1").strip().lower()
+        if not token_allowed(headers.get(PROFILE_TOKEN_HEADER.lower())):
+            await PlainTextResponse("Invalid profiling token", status_code=403)(scope, receive, send)
+            return
+        if fmt not in profiler.PROFILE_FORMATS:
+            message = f"Unknown {PROFILE_HEADER} format, expected one of {list(profiler.PROFILE_FORMATS)}"
+            await PlainTextResponse(message, status_code=400)(scope, receive, send)
+            return
+        if not profiler.profiling_lock.acquire(blocking=False):
+            await PlainTextResponse("A profile is already running", status_code=409)(scope, receive, send)
+            return
+
+        status = 500
+
+        async def capture(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+        try:
+            if fmt == "collapsed":
+                sampler = profiler.StackSampler(settings.profiler_interval)
+                sampler.start()
+                try:
+                    await self.app(scope, receive, capture)
+                finally:
+                    sampler.stop()
+                content = sampler.collapsed()
+            else:
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    await self.app(scope, receive, capture)
+                finally:
+                    profile.disable()
+                content = profiler.pstats_report(profile, fmt)
+        finally:
+            profiler.profiling_lock.release()
+        response = Response(
+            content, media_type=profiler.PROFILE_MEDIA_TYPES[fmt], headers={PROFILE_STATUS_HEADER: str(status)}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,38 @@
+"""
+Fichier de définition des routes API d'ingestion de la télémétrie
+"""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.database import get_async_database
+from db.schemas import TelemetryAccepted, TelemetryBatch, TelemetrySeries
+from services import telemetry_service
+
+telemetry_router = APIRouter(prefix="/telemetry")
+
+
+@telemetry_router.post("", response_model=TelemetryAccepted, status_code=202)
+async def ingest_samples(payload: TelemetryBatch, db: AsyncSession = Depends(get_async_database)):
+    try:
+        return {"accepted": await telemetry_service.ingest_async(db, payload.samples)}
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except BufferError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@telemetry_router.get("/{user_id}/{metric}", response_model=TelemetrySeries)
+async def get_series(
+    user_id: int,
+    metric: str,
+    start: float,
+    end: float,
+    resolution: Optional[float] = Query(None, gt=0),
+    db: AsyncSession = Depends(get_async_database),
+):
+    try:
+        return await telemetry_service.query_series_async(db, user_id, metric, start, end, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -2,29 +2,56 @@
 Fichier de définition des routes API pour la gestion des utilisateurs
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from db.schemas import UserCreate, UserDelete, UserRead
+from db.schemas import BulkDeleteResult, UserBulkDelete, UserCreate, UserDelete, UserRead
 from services import user_service
-from db.database import get_database
+from db.database import get_async_database
+from utils.utils import NEXT_CURSOR_HEADER, encode_cursor
 
 user_router = APIRouter()
 
 @user_router.get("/user", response_model=list[UserRead])
-def list_users(db: Session = Depends(get_database)):
-    return user_service.list_users(db)
+async def list_users(
+    response: Response,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_database),
+):
+    try:
+        users = await user_service.list_users_async(db, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if len(users) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(users[-1].created_at, users[-1].id)
+    return users
 
 @user_router.post("/user/create", response_model=UserRead)
-def create_user(user: UserCreate, db: Session = Depends(get_database)):
+async def create_user(user: UserCreate, db: AsyncSession = Depends(get_async_database)):
     try:
-        return user_service.create_user(db, user)
+        return await user_service.create_user_async(db, user)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
 
 @user_router.post("/user/delete", response_model=UserRead)
-def delete_user(payload: UserDelete, db: Session = Depends(get_database)):
+async def delete_user(payload: UserDelete, db: AsyncSession = Depends(get_async_database)):
+    try:
+        return await user_service.delete_user_async(db, payload.user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+@user_router.post("/user/bulk_create", response_model=list[UserRead])
+async def create_users(users: list[UserCreate], db: AsyncSession = Depends(get_async_database)):
     try:
-        return user_service.delete_user(db, payload.user_id)
+        return await user_service.create_users_async(db, users)
     except ValueError as e:
-        raise HTTPException(status_code=422, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=422, detail=str(e))
+
+@user_router.post("/user/bulk_delete", response_model=BulkDeleteResult)
+async def delete_users(payload: UserBulkDelete, db: AsyncSession = Depends(get_async_database)):
+    try:
+        return BulkDeleteResult(deleted=await user_service.delete_users_async(db, payload.user_ids))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -2,9 +2,101 @@
 Fichier de définition du serveur WebSocket
 """
 
-from fastapi import APIRouter, WebSocket
+import json
+
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+
+from db.database import AsyncSessionLocal
+from db.schemas import ChooseScoreRequest, RollRequest
+from managers.broker import get_broker
+from managers.manager_connection import ConnectionManager
+from services import game_service, telemetry_service
+from services.game_cache import CachedGame
+from utils import state_codec
 
 ws_router = APIRouter()
+manager = ConnectionManager()
+broker = get_broker()
+
+
+async def receive_json_message(websocket: WebSocket):
+    """
+    Reçoit un message JSON texte.
+
+    :raises ValueError: Si le message est binaire ou n'est pas du JSON valide (la connexion reste ouverte)
+    :raises WebSocketDisconnect: Si le client s'est déconnecté
+    """
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000), message.get("reason"))
+    text = message.get("text")
+    if text is None:
+        raise ValueError("Expected a JSON text message")
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON message: {e}") from e
+
+
+def game_payload(game: CachedGame) -> dict:
+    """
+    Partie au format de `GameRead`, construite directement depuis `CachedGame` (sans validation pydantic).
+    """
+    return {
+        "id": game.id,
+        "user_id": game.user_id,
+        "created_at": game.created_at.isoformat(),
+        "state": game.state,
+        "finished": game.finished,
+    }
+
+
+def game_message(game: CachedGame) -> str:
+    return json.dumps(game_payload(game), separators=(",", ":"))
+
+
+def state_delta(before: CachedGame, after: CachedGame) -> dict:
+    """
+    Différence compacte entre deux états d'une partie : champs modifiés de `state`,
+    catégories nouvellement marquées dans `scores`, et `finished` s'il a changé.
+    """
+    changes = {
+        key: value for key, value in after.state.items() if key != "scores" and before.state.get(key) != value
+    }
+    scores = {
+        category: points
+        for category, points in after.state["scores"].items()
+        if before.state["scores"].get(category) != points
+    }
+    if scores:
+        changes["scores"] = scores
+    delta = {"type": "delta", "seq": after.journal_seq, "state": changes}
+    if after.finished != before.finished:
+        delta["finished"] = after.finished
+    return delta
+
+
+def push_game_move(kind: str, game: CachedGame) -> None:
+    """
+    Abonné aux coups de `Game` : publie le nouvel état pour les clients abonnés à la partie, quel que soit leur worker.
+    Avec un broker limité au processus, rien n'est sérialisé si la partie n'a aucun abonné.
+    """
+    if not broker.remote and not manager.has_subscribers(game.id):
+        return
+    broker.publish(game.id, game_message(game))
+
+
+def deliver_local(room: int, message: str) -> None:
+    """
+    Abonné au broker : diffuse un événement publié par n'importe quel worker aux connexions locales du salon.
+    """
+    if manager.has_subscribers(room):
+        manager.publish(room, message)
+
+
+game_service.game_move_listeners.append(push_game_move)
+broker.subscribe(deliver_local)
+
 
 @ws_router.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
@@ -12,3 +104,102 @@ async def websocket_endpoint(websocket: WebSocket):
     while True:
         data = await websocket.receive_text()
         await websocket.send_text(f"Message text was: {data}")
+
+
+@ws_router.websocket("/ws/game/{game_id}")
+async def game_websocket(websocket: WebSocket, game_id: int):
+    """
+    Canal d'une partie : envoie l'état courant à la connexion puis chaque nouvel état après un coup.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            game = await game_service.AsyncGame(db, game_id).get()
+    except ValueError:
+        await websocket.close(code=1008, reason="Game not found")
+        return
+
+    await manager.connect(websocket, room=game_id)
+    try:
+        await manager.send_personal_message(game_message(game), websocket)
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        manager.disconnect(websocket)
+
+
+@ws_router.websocket("/ws/game/{game_id}/play")
+async def play_websocket(websocket: WebSocket, game_id: int, format: str = "json"):
+    """
+    Partie jouée sur la connexion : le client envoie `{"type": "roll", "locked_dice": [...]}` ou
+    `{"type": "score", "category": "..."}` et reçoit en réponse la différence d'état (`state_delta`),
+    ou avec `?format=binary` l'état complet au format compact de `utils.state_codec` (18 octets).
+    La partie reste chargée pendant toute la connexion ; la session ne garde sa connexion à la base
+    que le temps d'un coup.
+    """
+    async with AsyncSessionLocal() as db:
+        game = game_service.AsyncGame(db, game_id)
+        try:
+            current = await game.bind()
+        except ValueError:
+            await websocket.close(code=1008, reason="Game not found")
+            return
+        finally:
+            await db.close()
+
+        await websocket.accept()
+        binary = format == "binary"
+        if binary:
+            await websocket.send_bytes(state_codec.encode_dict(current.state))
+        else:
+            await websocket.send_json({"type": "state", "seq": current.journal_seq, "game": game_payload(current)})
+        try:
+            while True:
+                try:
+                    message = await receive_json_message(websocket)
+                    kind = message.get("type") if isinstance(message, dict) else None
+                    if kind == "roll":
+                        updated = await game.roll(RollRequest.model_validate(message).locked_dice)
+                    elif kind == "score":
+                        updated = await game.choose_score(ChooseScoreRequest.model_validate(message).category)
+                    else:
+                        raise ValueError("Unknown message type")
+                except (ValueError, BufferError) as e:
+                    await websocket.send_json({"type": "error", "detail": str(e)})
+                    continue
+                finally:
+                    await db.close()
+                if binary:
+                    await websocket.send_bytes(state_codec.encode_dict(updated.state))
+                else:
+                    await websocket.send_json(state_delta(current, updated))
+                current = updated
+        except WebSocketDisconnect:
+            pass
+
+
+@ws_router.websocket("/ws/telemetry/{user_id}")
+async def telemetry_websocket(websocket: WebSocket, user_id: int):
+    """
+    Flux de télémétrie d'un utilisateur : chaque message est une liste `[[metric, timestamp, value], ...]`,
+    acquittée par `{"accepted": n}` ou `{"type": "error", "detail": ...}` (lot refusé en entier).
+    """
+    async with AsyncSessionLocal() as db:
+        known = await telemetry_service.existing_user_ids_async(db, [user_id])
+    if not known:
+        await websocket.close(code=1008, reason="User not found")
+        return
+
+    await websocket.accept()
+    try:
+        while True:
+            try:
+                rows = await receive_json_message(websocket)
+                accepted = telemetry_service.telemetry.ingest_rows(user_id, rows)
+            except (ValueError, BufferError) as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+                continue
+            await websocket.send_json({"accepted": accepted})
+    except WebSocketDisconnect:
+        pass
@@ -2,15 +2,69 @@
 Fichier de configuration de l'environnement de l'application
 """
 
+from typing import Optional
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     app_name: str = "Yathzee API"
     database_url: str = ""
+    async_database_url: str = ""  # déduite de `database_url` si vide
     debug: bool = False
+    sql_echo: bool = False  # journalise chaque requête SQL (débogage uniquement)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_recycle: int = 1800  # secondes
+    db_pool_pre_ping: bool = True
+    sqlite_cache_size: int = -65536  # négatif : taille en Kio (64 Mio)
+    sqlite_mmap_size: int = 268435456  # 256 Mio
+    sqlite_busy_timeout: int = 5000  # millisecondes
+    strategy_table_path: str = "strategy_table.bin"
+    dice_mode: str = "secure"  # "secure" (CSPRNG, parties classées) ou "fast" (PRNG reproductible)
+    dice_seed: Optional[int] = None
+    game_cache_size: int = 10000  # 0 désactive le cache des parties en cours
+    game_cache_ttl: float = 300.0
+    # Écriture différée des coups dans `game_moves`. Les numéros de coups viennent de l'état en mémoire :
+    # un seul worker (`WS_BROKER=memory`), à désactiver pour plusieurs workers
+    journal_enabled: bool = True
+    journal_flush_interval: float = 1.0
+    journal_snapshot_every: int = 20  # nombre de coups entre deux réécritures de `GameSession.state`
+    journal_max_pending: int = 100000  # coups en attente d'écriture au-delà desquels un coup est refusé
+    leaderboard_top_size: int = 100  # nombre de meilleures parties gardées en mémoire
+    state_storage: str = "json"  # format de `GameSession.state` : "json" ou "packed" (`utils.state_codec`)
+    ws_queue_size: int = 16  # messages en attente par connexion WebSocket avant fusion
+    ws_send_timeout: float = 5.0  # délai d'envoi au-delà duquel une connexion est fermée
+    ws_broker: str = "memory"  # diffusion des événements entre workers : "memory" ou "unix"
+    ws_broker_path: str = "/tmp/yahtzee-broker"  # dossier des sockets du broker "unix"
+    telemetry_buffer_size: int = 262144  # échantillons gardés en mémoire avant écriture
+    telemetry_flush_interval: float = 1.0
+    telemetry_flush_batch: int = 50000  # échantillons au plus par transaction d'écriture
+    telemetry_max_batch: int = 10000  # échantillons au plus par envoi d'un client
+    telemetry_archive_path: str = "./telemetry_archive"  # dossier des fichiers d'archive
+    telemetry_hot_days: int = 7  # jours d'échantillons gardés en base avant archivage
+    metrics_enabled: bool = True  # mesures de latence exposées sur `/metrics`
+    profiler_enabled: bool = False  # profilage à chaud : en-tête `X-Profile` et route `/debug/profile`
+    profiler_token: str = ""  # jeton attendu dans `X-Profile-Token`, obligatoire si le profilage est activé
+    profiler_interval: float = 0.001  # période d'échantillonnage des piles d'une requête, en secondes
 
     model_config = SettingsConfigDict(env_file=".env.example", env_file_encoding="utf-8", extra="ignore")
 
+    @model_validator(mode="after")
+    def check_profiler_token(self) -> "Settings":
+        # Le profilage expose les piles et le code du processus : jamais sans jeton
+        if self.profiler_enabled and not self.profiler_token:
+            raise ValueError("PROFILER_TOKEN must be set when PROFILER_ENABLED is true")
+        return self
+
+    @model_validator(mode="after")
+    def check_journal_single_worker(self) -> "Settings":
+        # Les numéros de coups du journal viennent de l'état en mémoire d'un seul worker
+        if self.journal_enabled and self.ws_broker != "memory":
+            raise ValueError(
+                "JOURNAL_ENABLED requires WS_BROKER=memory (a single worker), disable the journal for several workers"
+            )
+        return self
+
 
 settings = Settings()
@@ -2,18 +2,78 @@
 Fichier principal de gestion de la connexion à la base de données SQLite
 """
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, make_url
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from core.config import settings
+from utils.metrics import instrument_engine
+
+# Pilotes asynchrones utilisés lorsque `ASYNC_DATABASE_URL` n'est pas renseignée
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def to_async_url(url: str) -> str:
+    """
+    Convertit une URL de base de données synchrone vers le pilote asynchrone équivalent.
+    """
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.get_backend_name(), parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Options communes des moteurs synchrone et asynchrone : journalisation SQL et pool de connexions.
+    """
+    options = {
+        "echo": settings.sql_echo,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+    # Une base SQLite en mémoire utilise un pool à connexion unique, sans taille configurable
+    if make_url(url).database not in (None, "", ":memory:"):
+        options.update(pool_size=settings.db_pool_size, max_overflow=settings.db_max_overflow)
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Réglages appliqués à chaque nouvelle connexion SQLite : journal WAL (lecteurs non bloqués par
+    l'écrivain), synchronisation réduite, cache et mmap dimensionnés, attente sur verrou, et clés
+    étrangères vérifiées (nécessaires aux suppressions `ON DELETE CASCADE`).
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+def configure_engine(engine: Engine) -> Engine:
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", set_sqlite_pragmas)
+    if settings.metrics_enabled:
+        instrument_engine(engine)
+    return engine
+
 
 DATABASE_URL = settings.database_url
+ASYNC_DATABASE_URL = settings.async_database_url or to_async_url(DATABASE_URL)
 
 # Création de l'instance SQLAlchemy et du constructeur de sessions
-engine = create_engine(
-    url=DATABASE_URL,
-    echo=True,
-)
+engine = configure_engine(create_engine(url=DATABASE_URL, **engine_options(DATABASE_URL)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Moteur asynchrone des routes de l'API (aiosqlite en local, asyncpg en production).
+# Les objets restent chargés après commit : ils sont sérialisés hors de la session.
+async_engine = create_async_engine(url=ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+configure_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 
@@ -23,3 +83,8 @@ def get_database():
         yield db
     finally:
         db.close()
+
+
+async def get_async_database():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,129 @@
+"""
+Fichier de mise à jour du schéma de la base de données au démarrage
+"""
+
+from typing import Callable
+from sqlalchemy import Table, bindparam, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+
+from db import models  # noqa: F401  (enregistre les modèles dans Base.metadata)
+from db.database import Base
+from db.models import GameSession
+
+
+def backfill_game_scores(connection: Connection) -> None:
+    """
+    Renseigne `total_score` et `finished_at` des parties existantes à partir de l'état JSON.
+    La date de fin réelle des anciennes parties étant inconnue, elle est approchée par `created_at`.
+    """
+    rows = connection.execute(
+        select(GameSession.id, GameSession.state, GameSession.finished, GameSession.created_at)
+    ).all()
+    params = [
+        {
+            "game_id": row.id,
+            "total_score": (row.state or {}).get("total_score") or 0,
+            "finished_at": row.created_at if row.finished else None,
+        }
+        for row in rows
+    ]
+    if params:
+        table = GameSession.__table__
+        connection.execute(
+            table.update()
+            .where(table.c.id == bindparam("game_id"))
+            .values(total_score=bindparam("total_score"), finished_at=bindparam("finished_at")),
+            params,
+        )
+
+
+# Reprises de données exécutées lorsqu'une colonne vient d'être ajoutée
+BACKFILLS: dict[tuple[str, str], Callable[[Connection], None]] = {
+    ("game_sessions", "total_score"): backfill_game_scores,
+}
+
+
+def missing_cascades(connection: Connection, table: Table) -> bool:
+    """
+    Indique si une table SQLite existante n'a pas les `ON DELETE` déclarés dans son modèle
+    (SQLite ne permet pas de modifier une contrainte sans recréer la table).
+    """
+    declared = {fk.parent.name: (fk.ondelete or "NO ACTION").upper() for fk in table.foreign_keys}
+    if not declared:
+        return False
+    existing = {row[3]: row[6].upper() for row in connection.exec_driver_sql(f"PRAGMA foreign_key_list({table.name})")}
+    return any(existing.get(column) != on_delete for column, on_delete in declared.items())
+
+
+def rebuild_sqlite_table(connection: Connection, table: Table) -> None:
+    """
+    Recrée une table SQLite depuis son modèle en conservant ses lignes, puis ses index.
+    Les lignes orphelines (parent supprimé alors que les clés étrangères n'étaient pas vérifiées) sont écartées.
+    Les clés étrangères doivent être désactivées sur la connexion.
+    """
+    new_name = f"_new_{table.name}"
+    ddl = str(CreateTable(table).compile(dialect=connection.dialect)).strip()
+    connection.exec_driver_sql(ddl.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {new_name} ", 1))
+
+    existing = {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table.name})")}
+    columns = ", ".join(column.name for column in table.columns if column.name in existing)
+    conditions = [
+        f"({fk.parent.name} IS NULL OR {fk.parent.name} IN (SELECT {fk.column.name} FROM {fk.column.table.name}))"
+        for fk in table.foreign_keys
+    ]
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    connection.exec_driver_sql(f"INSERT INTO {new_name} ({columns}) SELECT {columns} FROM {table.name}{where}")
+    connection.exec_driver_sql(f"DROP TABLE {table.name}")
+    connection.exec_driver_sql(f"ALTER TABLE {new_name} RENAME TO {table.name}")
+    for index in table.indexes:
+        index.create(connection)
+
+
+def upgrade(engine: Engine) -> None:
+    """
+    Crée les tables manquantes puis ajoute les colonnes et index absents des tables existantes.
+    Les colonnes ajoutées doivent être nullables ou avoir une valeur par défaut côté serveur.
+    Sous SQLite, les tables dont les clés étrangères n'ont pas le `ON DELETE` du modèle sont recréées.
+    """
+    Base.metadata.create_all(bind=engine)
+
+    inspector = inspect(engine)
+    added: list[tuple[str, str]] = []
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                if not column.nullable:
+                    ddl += " NOT NULL"
+                connection.execute(text(ddl))
+                added.append((table.name, column.name))
+
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(connection)
+
+        for key in added:
+            if key in BACKFILLS:
+                BACKFILLS[key](connection)
+
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            # Hors transaction : SQLite ignore ce PRAGMA dans une transaction ouverte
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+            try:
+                for table in Base.metadata.sorted_tables:
+                    if missing_cascades(connection, table):
+                        rebuild_sqlite_table(connection, table)
+                connection.commit()
+            finally:
+                connection.rollback()
+                connection.exec_driver_sql("PRAGMA foreign_keys=ON")
+                connection.commit()
@@ -3,32 +3,156 @@ Modèles ORM de la base de données SQLite
 """
 
 from datetime import datetime
-from sqlalchemy import JSON, Column, DateTime, ForeignKey, Integer, String
+import json
+
+from sqlalchemy import JSON, Column, DateTime, Float, ForeignKey, Index, Integer, LargeBinary, String
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator, UserDefinedType
 
+from core.config import settings
 from db.database import Base
+from utils import state_codec
+
+
+class _SQLiteState(UserDefinedType):
+    """
+    Colonne déclarée `JSON` comme avant, sans conversion : SQLite garde dans la même colonne
+    du texte JSON et des octets, rendus tels quels par le pilote.
+    """
+
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return "JSON"
+
+
+class GameStateType(TypeDecorator):
+    """
+    Colonne d'état d'une partie : JSON, ou 18 octets au format `utils.state_codec`
+    selon `settings.state_storage`.
+
+    Sous SQLite, la lecture reconnaît les deux formats, ce qui permet de changer de format sans
+    réécrire les lignes existantes. Ailleurs (PostgreSQL), la colonne est `JSON` ou binaire
+    (`LargeBinary`) selon le format : en changer demande de convertir la colonne.
+    """
+
+    impl = JSON
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return _SQLiteState()
+        if settings.state_storage == "packed":
+            return dialect.type_descriptor(LargeBinary())
+        return dialect.type_descriptor(JSON())
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if settings.state_storage == "packed":
+            return state_codec.encode_dict(value)
+        if dialect.name == "sqlite":
+            return json.dumps(value)
+        # Sérialisé par le type `JSON` du dialecte
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if isinstance(value, (bytes, memoryview)):
+            return state_codec.unpack(bytes(value))
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
+
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (Index("ix_users_created_at_id", "created_at", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String)
     email = Column(String)
-    created_at = Column(DateTime, default=datetime.now())
+    created_at = Column(DateTime, default=datetime.now)
 
-    games = relationship("GameSession", back_populates="user", cascade="all, delete-orphan")
+    # Suppression en cascade par la base (`ON DELETE CASCADE`) : les parties ne sont pas chargées
+    games = relationship("GameSession", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
 
 class GameSession(Base):
     __tablename__ = "game_sessions"
+    __table_args__ = (
+        Index("ix_game_sessions_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_game_sessions_user_id_finished_created_at_id", "user_id", "finished", "created_at", "id"),
+        Index("ix_game_sessions_finished_total_score", "finished", "total_score"),
+        Index("ix_game_sessions_user_id_finished_total_score", "user_id", "finished", "total_score"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    # état du jeu stocké en JSON : dice_values [6 ints], rolls_left int, round int (0..12),
-    # scores dict {category_name: int | null}, total_score int
-    state = Column(JSON, nullable=False, default={})
+    # état du jeu (JSON ou format compact) : dice_values [5 ints], rolls_left int, round int (0..13),
+    # scores dict {category_name: int | null}, total_score int, locked_dice [ints]
+    state = Column(GameStateType, nullable=False, default={})
     finished = Column(Integer, default=0)  # 0 = en cours, 1 = fini
+    # copies de `state` tenues à jour à chaque instantané, pour les classements
+    total_score = Column(Integer, nullable=False, default=0, server_default="0")
+    finished_at = Column(DateTime, nullable=True)
+    # numéro du dernier coup inclus dans `state` (les coups suivants sont dans `game_moves`)
+    journal_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
+    user = relationship("User", back_populates="games")
+    moves = relationship("GameMove", cascade="all, delete-orphan", passive_deletes=True)
+
+
+class GameMove(Base):
+    """
+    Journal des coups d'une partie (lancers et choix de score), en ajout seul.
+    """
+
+    __tablename__ = "game_moves"
+    __table_args__ = (Index("ix_game_moves_game_id_seq", "game_id", "seq", unique=True),)
+
+    id = Column(Integer, primary_key=True)
+    game_id = Column(Integer, ForeignKey("game_sessions.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    kind = Column(String, nullable=False)  # "roll" : {locked_dice, rolled}, "score" : {category}
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class TelemetrySample(Base):
+    """
+    Échantillon de télémétrie d'un utilisateur (une métrique de `ALLOWED_METRICS`), écrit par lots.
+    """
+
+    __tablename__ = "telemetry_samples"
+    __table_args__ = (Index("ix_telemetry_samples_user_id_metric_timestamp", "user_id", "metric", "timestamp"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    metric = Column(String, nullable=False)
+    timestamp = Column(Float, nullable=False)  # secondes depuis l'epoch (UTC)
+    value = Column(Float, nullable=False)
+
+
+class TelemetryRollup(Base):
+    """
+    Agrégats des échantillons de télémétrie par intervalle de `resolution` secondes (paliers 1 s, 1 min, 1 h),
+    tenus à jour à chaque écriture d'échantillons.
+    """
+
+    __tablename__ = "telemetry_rollups"
+    __table_args__ = {"sqlite_with_rowid": False}
 
-    user = relationship("User", back_populates="games")
\ No newline at end of file
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    metric = Column(String, primary_key=True)
+    resolution = Column(Integer, primary_key=True)  # secondes
+    bucket = Column(Integer, primary_key=True)  # début de l'intervalle, secondes depuis l'epoch
+    count = Column(Integer, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+    sum = Column(Float, nullable=False)
+    last = Column(Float, nullable=False)
+    last_timestamp = Column(Float, nullable=False)
@@ -18,6 +18,14 @@ class UserCreate(UserBase):
 class UserDelete(BaseModel):
     user_id: int
 
+class UserBulkDelete(BaseModel):
+    user_ids: list[int]
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: int
+
+
 class UserRead(UserBase):
     id: int
     created_at: datetime
@@ -54,9 +62,94 @@ class GameRead(BaseModel):
         return GameState(**self.state)
 
 
+class GameSummary(BaseModel):
+    id: int
+    user_id: int
+    created_at: datetime
+    finished: int
+    total_score: int
+    state: Optional[dict] = None  # renseigné uniquement avec `include_state=true`
+
+    class Config:
+        from_attributes = True
+
+
 class RollRequest(BaseModel):
     locked_dice: Optional[list[int]] = None
 
 
 class ChooseScoreRequest(BaseModel):
     category: str
+
+
+class Hint(BaseModel):
+    action: str  # "roll" : relancer en verrouillant `locked_dice`, "score" : marquer `category`
+    locked_dice: list[int] = []
+    category: Optional[str] = None
+    expected_score: float
+
+
+class LeaderboardEntry(BaseModel):
+    game_id: int
+    user_id: int
+    username: Optional[str] = None
+    total_score: int
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class UserStats(BaseModel):
+    user_id: int
+    username: Optional[str] = None
+    games: int
+    best_score: int
+    mean_score: float
+    yahtzees: int
+    rank: int  # rang de l'utilisateur par meilleur score
+
+
+class ScoreRank(BaseModel):
+    total_score: int
+    rank: int  # 1 = meilleure partie terminée
+    total: int  # nombre de parties terminées classées
+
+
+class GameRank(BaseModel):
+    game_id: int
+    total_score: int
+    rank: int  # 1 = meilleure partie terminée
+    total: int  # nombre de parties terminées classées
+
+
+class TelemetrySampleIn(BaseModel):
+    user_id: int
+    metric: str
+    timestamp: float  # secondes depuis l'epoch (UTC)
+    value: float
+
+
+class TelemetryBatch(BaseModel):
+    samples: list[TelemetrySampleIn]
+
+
+class TelemetryAccepted(BaseModel):
+    accepted: int
+
+
+class TelemetryPoint(BaseModel):
+    timestamp: float  # début de l'intervalle
+    count: int
+    min: float
+    max: float
+    mean: float
+    last: float
+
+
+class TelemetrySeries(BaseModel):
+    user_id: int
+    metric: str
+    resolution: float  # largeur des intervalles en secondes
+    tier: Optional[int]  # palier d'agrégats utilisé, `None` pour les échantillons bruts
+    points: list[TelemetryPoint]
@@ -2,29 +2,69 @@
 Fichier principal d'exécution de FastAPI
 """
 
-from pathlib import Path
+from contextlib import asynccontextmanager
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.user import user_router
-from api.ws import ws_router
+from api.ws import broker, ws_router
 from api.root import root_router
 from api.game import game_router
-from db.database import Base, engine
+from api.leaderboard import leaderboard_router
+from api.telemetry import telemetry_router
+from api.metrics import MetricsMiddleware, metrics_router
+from api.profiler import ProfilerMiddleware, profiler_router
+from core.config import settings
+from db.database import engine
+from db.migrations import upgrade
+from services.leaderboard_service import leaderboard
+from services.move_journal import move_journal
+from services.solver import get_solver
+from services.telemetry_service import telemetry
+from utils.utils import NEXT_CURSOR_HEADER
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    move_journal.start()
+    telemetry.start()
+    await broker.start()
+    # Chargement (ou construction) de la table du solveur hors de la boucle d'événements
+    await asyncio.to_thread(get_solver)
+    await asyncio.to_thread(leaderboard.warm)
+    yield
+    await broker.stop()
+    telemetry.stop()
+    move_journal.stop()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
+# Désactivé, le profilage n'installe ni middleware ni route : aucun coût par requête
+if settings.profiler_enabled:
+    app.add_middleware(ProfilerMiddleware)
+# Ajouté en dernier : englobe les autres middlewares et mesure la requête complète
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
-if not Path("yathzee.db").exists():
-    Base.metadata.create_all(bind=engine)
+upgrade(engine)
 
 app.include_router(user_router, tags=["User"])
 app.include_router(ws_router, tags=["WebSocket"])
+# Avant `game_router` : ses routes `/{game_id}` captureraient `/leaderboard` et `/metrics`
+app.include_router(leaderboard_router, tags=["Leaderboard"])
+if settings.metrics_enabled:
+    app.include_router(metrics_router, tags=["Metrics"])
+if settings.profiler_enabled:
+    app.include_router(profiler_router, tags=["Debug"])
+app.include_router(telemetry_router, tags=["Telemetry"])
 app.include_router(game_router, tags=["Game"])
 app.include_router(root_router)
@@ -0,0 +1,154 @@
+"""
+Fichier de définition des brokers de diffusion des événements entre workers
+"""
+
+from abc import ABC, abstractmethod
+from typing import Callable, Hashable, Optional
+import asyncio
+import json
+import logging
+import os
+import socket
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Fonction appelée pour chaque message reçu, avec son salon et son contenu déjà sérialisé
+Handler = Callable[[Hashable, str], None]
+
+
+class Broker(ABC):
+    """
+    Diffusion publish/subscribe d'événements entre les processus qui servent l'API.
+    `publish` peut être appelé depuis du code synchrone ; les abonnés sont appelés dans chaque processus.
+    """
+
+    # Les événements publiés sont aussi remis aux autres processus
+    remote: bool = False
+
+    def __init__(self):
+        self.handlers: list[Handler] = []
+
+    def subscribe(self, handler: Handler) -> None:
+        self.handlers.append(handler)
+
+    def _deliver(self, room: Hashable, message: str) -> None:
+        for handler in self.handlers:
+            try:
+                handler(room, message)
+            except Exception:
+                logger.exception("Broker handler %r failed", handler)
+
+    @abstractmethod
+    def publish(self, room: Hashable, message: str) -> None: ...
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class InProcessBroker(Broker):
+    """
+    Diffusion limitée au processus courant (un seul worker).
+    """
+
+    def publish(self, room: Hashable, message: str) -> None:
+        self._deliver(room, message)
+
+
+class UnixSocketBroker(Broker):
+    """
+    Diffusion entre les workers d'une même machine par sockets Unix en datagrammes.
+
+    Chaque worker lie une socket `<pid>.sock` dans `directory` ; un message est remis localement puis
+    envoyé une fois à chacune des autres sockets du dossier. Les sockets des workers arrêtés sont supprimées
+    au premier envoi refusé. Un pair saturé perd le message plutôt que de bloquer le publieur.
+    """
+
+    remote = True
+
+    def __init__(self, directory: str):
+        """
+        :param directory: Dossier partagé par les workers
+        """
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def start(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(self.path)
+        self._sock.setblocking(False)
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(self._sock.fileno(), self._receive)
+
+    async def stop(self) -> None:
+        if self._sock is None:
+            return
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _peers(self) -> list[str]:
+        with os.scandir(self.directory) as entries:
+            return [e.path for e in entries if e.name.endswith(".sock") and e.path != self.path]
+
+    def publish(self, room: Hashable, message: str) -> None:
+        self._deliver(room, message)
+        if self._sock is None:
+            return
+        datagram = json.dumps([room, message]).encode()
+        for peer in self._peers():
+            try:
+                self._sock.sendto(datagram, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                try:
+                    os.unlink(peer)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                logger.warning("Broker peer %s is saturated, message dropped", peer)
+
+    def _receive(self) -> None:
+        while True:
+            try:
+                datagram = self._sock.recv(65536)
+            except BlockingIOError:
+                return
+            try:
+                room, message = json.loads(datagram)
+            except (ValueError, TypeError) as e:
+                # Datagramme tronqué ou corrompu : ignoré, les suivants restent lus
+                logger.error("Ignoring malformed broker datagram (%d bytes): %s", len(datagram), e)
+                continue
+            self._deliver(room, message)
+
+
+_broker: Optional[Broker] = None
+
+
+def get_broker() -> Broker:
+    """
+    Retourne le broker du processus, selon `settings.ws_broker` ("memory" ou "unix").
+    """
+    global _broker
+    if _broker is None:
+        if settings.ws_broker == "memory":
+            _broker = InProcessBroker()
+        elif settings.ws_broker == "unix":
+            _broker = UnixSocketBroker(settings.ws_broker_path)
+        else:
+            raise ValueError(f"Unknown broker: {settings.ws_broker}")
+    return _broker
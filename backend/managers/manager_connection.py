@@ -2,23 +2,137 @@
 Fichier proposant une classe d'interaction avec les connexions au WebSocket
 """
 
+from typing import Hashable, Optional
+import asyncio
+import logging
+
 from fastapi import WebSocket
 
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class _Client:
+    """
+    Connexion suivie par le gestionnaire : file d'envoi bornée vidée par une tâche dédiée.
+    """
+
+    __slots__ = ("websocket", "queue", "rooms", "task", "dropped")
+
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=queue_size)
+        self.rooms: set[Hashable] = set()
+        self.task: Optional[asyncio.Task] = None
+        self.dropped = 0  # messages écartés parce que la connexion ne suivait pas
+
+    def offer(self, message: str) -> None:
+        """
+        Ajoute un message sans attendre. File pleine : le plus ancien est écarté,
+        les messages étant des états complets, le client reçoit toujours le dernier.
+        """
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
 
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
+    """
+    Gestionnaire des connexions WebSocket et de leurs salons.
 
-    async def connect(self, websocket: WebSocket):
+    Une diffusion ne fait que déposer le message (sérialisé une seule fois) dans la file de chaque
+    destinataire : son coût ne dépend pas de la vitesse des clients. Chaque connexion est servie par sa
+    propre tâche d'envoi ; une connexion qui dépasse `send_timeout` ou dont l'envoi échoue est fermée.
+    """
+
+    def __init__(self, queue_size: int = settings.ws_queue_size, send_timeout: float = settings.ws_send_timeout):
+        """
+        :param queue_size: Nombre de messages en attente par connexion avant fusion
+        :param send_timeout: Délai maximal en secondes d'un envoi à une connexion
+        """
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.active_connections: dict[WebSocket, _Client] = {}
+        # Salons : connexions abonnées à un même sujet (par exemple l'ID d'une partie)
+        self.rooms: dict[Hashable, set[WebSocket]] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def connect(self, websocket: WebSocket, room: Optional[Hashable] = None):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        self.loop = asyncio.get_running_loop()
+        client = _Client(websocket, self.queue_size)
+        client.task = self.loop.create_task(self._sender(client))
+        self.active_connections[websocket] = client
+        if room is not None:
+            self.join(websocket, room)
+
+    def join(self, websocket: WebSocket, room: Hashable):
+        client = self.active_connections[websocket]
+        client.rooms.add(room)
+        self.rooms.setdefault(room, set()).add(websocket)
+
+    def leave(self, websocket: WebSocket, room: Hashable):
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.rooms.discard(room)
+        members = self.rooms.get(room)
+        if members is not None:
+            members.discard(websocket)
+            if not members:
+                del self.rooms[room]
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        """
+        Oublie une connexion et arrête sa tâche d'envoi (sans effet si elle est déjà retirée).
+        """
+        client = self.active_connections.pop(websocket, None)
+        if client is None:
+            return
+        for room in list(client.rooms):
+            self.leave(websocket, room)
+        if client.task is not None and client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    async def _sender(self, client: _Client):
+        try:
+            while True:
+                message = await client.queue.get()
+                await asyncio.wait_for(client.websocket.send_text(message), self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            logger.info("Closing slow or broken WebSocket connection: %r", exc)
+            self.disconnect(client.websocket)
+            try:
+                await client.websocket.close(code=1013)
+            except Exception:
+                pass
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        client = self.active_connections.get(websocket)
+        if client is not None:
+            client.offer(message)
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        for client in self.active_connections.values():
+            client.offer(message)
+
+    async def broadcast_room(self, room: Hashable, message: str):
+        """
+        Envoie un message aux seules connexions d'un salon.
+        """
+        for websocket in self.rooms.get(room, ()):
+            self.active_connections[websocket].offer(message)
+
+    def has_subscribers(self, room: Hashable) -> bool:
+        return room in self.rooms
+
+    def publish(self, room: Hashable, message: str):
+        """
+        Diffuse un message dans un salon depuis du code synchrone (y compris depuis un autre thread).
+        """
+        if self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(lambda: self.loop.create_task(self.broadcast_room(room, message)))
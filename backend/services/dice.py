@@ -0,0 +1,78 @@
+"""
+Fichier de définition des sources de tirage des dés
+"""
+
+from abc import ABC, abstractmethod
+from typing import Optional
+import random
+import secrets
+
+from core.config import settings
+
+FACES = (1, 2, 3, 4, 5, 6)
+
+
+class DiceSource(ABC):
+    """
+    Source de tirage : retourne en un appel les valeurs de plusieurs dés.
+    """
+
+    @abstractmethod
+    def roll(self, count: int) -> list[int]: ...
+
+
+class SecureDiceSource(DiceSource):
+    """
+    Tirage cryptographique (parties classées) : un seul appel à `secrets.token_bytes` par lancer,
+    avec rejet des octets >= 252 pour garder des faces équiprobables.
+    """
+
+    def roll(self, count: int) -> list[int]:
+        values: list[int] = []
+        while len(values) < count:
+            values.extend(byte % 6 + 1 for byte in secrets.token_bytes(count) if byte < 252)
+        return values[:count]
+
+
+class FastDiceSource(DiceSource):
+    """
+    Tirage pseudo-aléatoire rapide, reproductible à partir d'une graine (rejeux, tests, simulations).
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = random.Random(seed)
+
+    def roll(self, count: int) -> list[int]:
+        return self._rng.choices(FACES, k=count)
+
+
+class RecordedDiceSource(DiceSource):
+    """
+    Rejoue des valeurs déjà tirées (reconstruction d'une partie depuis son journal).
+    """
+
+    def __init__(self, values: list[int]):
+        self._values = values
+
+    def roll(self, count: int) -> list[int]:
+        if count != len(self._values):
+            raise ValueError("Recorded roll does not match the number of rerolled dice")
+        return list(self._values)
+
+
+_dice_source: Optional[DiceSource] = None
+
+
+def get_dice_source() -> DiceSource:
+    """
+    Retourne la source de tirage du processus, selon `settings.dice_mode` ("secure" ou "fast").
+    """
+    global _dice_source
+    if _dice_source is None:
+        if settings.dice_mode == "secure":
+            _dice_source = SecureDiceSource()
+        elif settings.dice_mode == "fast":
+            _dice_source = FastDiceSource(settings.dice_seed)
+        else:
+            raise ValueError(f"Unknown dice mode: {settings.dice_mode}")
+    return _dice_source
@@ -0,0 +1,156 @@
+"""
+Fichier de gestion du cache en mémoire des parties en cours
+"""
+
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+import threading
+import time
+
+from core.config import settings
+from services.runtime_state import RuntimeGameState
+
+
+class CachedGame:
+    """
+    Copie détachée d'une `GameSession` en cours, exposant les attributs lus par `GameRead`.
+    """
+
+    id: int
+    user_id: int
+    created_at: datetime
+    state: dict
+    finished: int
+    game_state: RuntimeGameState  # vue de `state` partageant ses listes et son dictionnaire
+    journal_seq: int  # numéro du dernier coup joué
+    snapshot_seq: int  # numéro du dernier coup inclus dans l'instantané `GameSession.state`
+
+    def __init__(
+        self,
+        id: int,
+        user_id: int,
+        created_at: datetime,
+        state: dict,
+        finished: int,
+        journal_seq: int = 0,
+        snapshot_seq: Optional[int] = None,
+    ):
+        self.id = id
+        self.user_id = user_id
+        self.created_at = created_at
+        self.state = state
+        self.finished = finished
+        self.game_state = RuntimeGameState.from_dict(state)
+        self.journal_seq = journal_seq
+        self.snapshot_seq = journal_seq if snapshot_seq is None else snapshot_seq
+
+
+class GameCache:
+    """
+    Cache LRU à durée de vie limitée des parties en cours, indexé par ID de partie.
+
+    Le cache est propre au processus : une partie doit être servie par un seul worker
+    (ou `ttl` rester court) pour qu'un autre worker ne rejoue pas un état périmé.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        :param max_size: Nombre maximal de parties gardées (0 désactive le cache)
+        :param ttl: Durée de vie d'une entrée en secondes
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, CachedGame]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, game_id: int) -> Optional[CachedGame]:
+        with self._lock:
+            item = self._entries.get(game_id)
+            if item is None:
+                return None
+            expires_at, game = item
+            if expires_at < time.monotonic():
+                del self._entries[game_id]
+                return None
+            self._entries.move_to_end(game_id)
+            return game
+
+    def peek(self, game_id: int) -> Optional[CachedGame]:
+        """
+        Comme `get`, sans changer la place de la partie dans l'ordre LRU (lectures de listes).
+        """
+        with self._lock:
+            return self._live(game_id)
+
+    def _live(self, game_id: int) -> Optional[CachedGame]:
+        item = self._entries.get(game_id)
+        return item[1] if item is not None and item[0] >= time.monotonic() else None
+
+    def _put(self, game: CachedGame) -> None:
+        self._entries[game.id] = (time.monotonic() + self.ttl, game)
+        self._entries.move_to_end(game.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def put(self, game: CachedGame) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._put(game)
+
+    def put_if_absent(self, game: CachedGame) -> CachedGame:
+        """
+        Ajoute une partie chargée depuis la base, sauf si une autre session l'a mise en cache entre-temps :
+        l'entrée déjà présente (éventuellement plus récente) est alors retournée.
+        """
+        if self.max_size <= 0:
+            return game
+        with self._lock:
+            current = self._live(game.id)
+            if current is not None:
+                self._entries.move_to_end(game.id)
+                return current
+            self._put(game)
+            return game
+
+    def replace(self, expected: CachedGame, game: CachedGame) -> bool:
+        """
+        Remplace l'entrée d'une partie après un coup, seulement si elle est toujours `expected` (ou absente) :
+        un coup joué entre-temps par une autre session sur le même état est refusé.
+
+        :return: `False` si l'entrée a changé depuis le chargement de `expected`
+        """
+        if self.max_size <= 0:
+            return True
+        with self._lock:
+            current = self._live(game.id)
+            if current is not None and current is not expected:
+                return False
+            self._put(game)
+            return True
+
+    def invalidate(self, game_id: int) -> None:
+        with self._lock:
+            self._entries.pop(game_id, None)
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Retire toutes les parties d'un utilisateur (suppression de l'utilisateur).
+        """
+        self.invalidate_users({user_id})
+
+    def invalidate_users(self, user_ids: set[int]) -> None:
+        """
+        Retire en un seul parcours les parties de plusieurs utilisateurs.
+        """
+        with self._lock:
+            for game_id in [gid for gid, (_, game) in self._entries.items() if game.user_id in user_ids]:
+                del self._entries[game_id]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+game_cache = GameCache(settings.game_cache_size, settings.game_cache_ttl)
@@ -2,14 +2,29 @@
 Fichier de gestion de la logique d'une session de jeu
 """
 
+from array import array
+from datetime import datetime
 from enum import Enum
+from sqlalchemy import tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, NamedTuple, Optional
 import collections
-import secrets
+import itertools
+import logging
 
-from db.models import GameSession, User
-from db.schemas import GameState
+import numpy as np
+
+from core.config import settings
+from db.models import GameMove, GameSession, User
+from services.runtime_state import RuntimeGameState
+from services.dice import DiceSource, RecordedDiceSource, get_dice_source
+from services.game_cache import CachedGame, game_cache
+from services.move_journal import move_journal
+from utils.metrics import game_method_duration, timed
+from utils.utils import decode_cursor
+
+logger = logging.getLogger(__name__)
 
 
 class CategoriesEnum(Enum):
@@ -28,17 +43,46 @@ class CategoriesEnum(Enum):
     CHANCE = "chance"
 
 
+# Fonctions appelées après l'enregistrement de chaque coup, avec son type ("roll" / "score") et la partie
+game_move_listeners: List[Callable[[str, CachedGame], None]] = []
+# Fonctions appelées avec la partie après l'enregistrement du coup qui la termine
+game_finished_listeners: List[Callable[[CachedGame], None]] = []
+
+
+class GameListing(NamedTuple):
+    """
+    Ligne de `Game.list_for_user` dont les colonnes viennent de l'état en mémoire.
+    """
+
+    id: int
+    user_id: int
+    created_at: datetime
+    finished: int
+    total_score: int
+    state: Optional[dict] = None
+
+
+def _notify(listeners: list, *args) -> None:
+    for listener in listeners:
+        try:
+            listener(*args)
+        except Exception:
+            logger.exception("Game listener %r failed", listener)
+
+
 class Game:
-    game: GameSession
-    state: GameState
+    game: CachedGame
+    state: RuntimeGameState
     db: Session
     game_id: Optional[int]
     user_id: Optional[int]
+    dice: DiceSource
 
-    def __init__(self, db: Session, game_id: Optional[int] = None):
+    def __init__(self, db: Session, game_id: Optional[int] = None, dice: Optional[DiceSource] = None):
         self.db = db
         self.game_id = game_id
         self.user_id = None
+        self.dice = dice or get_dice_source()
 
         if game_id is not None:
             self._load_game(game_id)
@@ -47,135 +91,266 @@ class Game:
     # Gestion du cycle de vie de la partie
     # ----------------------------------------------------------------------
 
-    def start(self, user_id: int) -> GameSession:
+    def start(self, user_id: int) -> CachedGame:
         """Crée une nouvelle session de jeu pour un utilisateur."""
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             raise ValueError("User not found")
 
-        self.state = GameState(
-            dice_values=[0, 0, 0, 0, 0],
-            rolls_left=3,
-            round=0,
-            scores={c.value: None for c in CategoriesEnum},
-            total_score=0,
-        )
+        self.state = self.new_state()
 
         # Convertir l'état en dictionnaire avant de le sauvegarder
-        state_dict = self.state.model_dump()
+        state_dict = self.state.to_dict()
         game = GameSession(user_id=user_id, state=state_dict, finished=0)
         self.db.add(game)
         self.db.commit()
         self.db.refresh(game)
 
-        self.game = game
-        # Accès aux valeurs via __dict__
-        self.game_id = game.__dict__["id"]
-        self.user_id = game.__dict__["user_id"]
-        return game
+        self.game = CachedGame(game.id, game.user_id, game.created_at, state_dict, game.finished)
+        self.game_id = self.game.id
+        self.user_id = self.game.user_id
+        game_cache.put(self.game)
+        return self.game
+
+    @staticmethod
+    def new_state() -> RuntimeGameState:
+        """Retourne l'état d'une partie qui commence."""
+        return RuntimeGameState(
+            dice_values=[0, 0, 0, 0, 0],
+            rolls_left=3,
+            round=0,
+            scores={c.value: None for c in CategoriesEnum},
+            total_score=0,
+        )
 
     def _load_game(self, game_id: Optional[int]):
         """
-        Charge une partie existante en base.
+        Charge une partie depuis le cache, ou à défaut depuis la base.
         """
         if game_id is None:
             raise ValueError("Game ID is required")
-        game = self.db.query(GameSession).filter(GameSession.id == game_id).first()
-        if not game:
-            raise ValueError("Game not found")
-        self.game = game
-        self.state = GameState(
-            dice_values=game.state.get("dice_values"),
-            rolls_left=game.state.get("rolls_left"),
-            round=game.state.get("round"),
-            scores=game.state.get("scores"),
-            total_score=game.state.get("total_score"),
-            locked_dice=game.state.get("locked_dice"),
-        )
+        move_journal.check_rejected(game_id)
+        cached = game_cache.get(game_id)
+        if cached is None:
+            if move_journal.has_pending(game_id):
+                move_journal.flush()
+            game = self.db.query(GameSession).filter(GameSession.id == game_id).first()
+            if not game:
+                raise ValueError("Game not found")
+            cached = self._replay_journal(game)
+            if not cached.finished:
+                # Une autre session a pu charger (et jouer) la partie pendant la lecture : on part de son entrée
+                cached = game_cache.put_if_absent(cached)
+        self.game = cached
+        self.user_id = cached.user_id
+        # Copie de travail : l'entrée du cache n'est remplacée qu'après un enregistrement réussi
+        self.state = cached.game_state.copy()
 
     # ----------------------------------------------------------------------
     # Lancer les dés
     # ----------------------------------------------------------------------
 
-    def _roll_dice(self, locked_dice: Optional[List[int]] = None):
-        self.state.locked_dice = locked_dice or []
-        if locked_dice is None:
-            self.state.dice_values = [secrets.choice(range(1, 6)) for _ in range(5)]
-        else:
-            for idx in range(5):
-                if idx not in locked_dice:
-                    self.state.dice_values[idx] = secrets.choice(range(1, 6))
+    @staticmethod
+    def apply_roll(state: RuntimeGameState, locked_dice: Optional[List[int]], dice: DiceSource) -> List[int]:
+        """
+        Applique les règles d'un lancer (ou d'une relance) à un état, sans accès à la base.
 
-    def roll(self, locked_dice: Optional[List[int]] = None) -> GameSession:
+        :param state: État de la partie, modifié sur place
+        :param locked_dice: Index des dés conservés, ou `None` pour relancer les 5 dés
+        :param dice: Source de tirage, sollicitée une seule fois pour tous les dés relancés
+        :return: Valeurs tirées pour les dés relancés
+        """
+        if state.rolls_left <= 0:
+            raise ValueError("No rolls left in this turn")
+
+        state.locked_dice = locked_dice or []
+        rerolled = [idx for idx in range(5) if idx not in state.locked_dice]
+        rolled = dice.roll(len(rerolled))
+        dice_values = list(state.dice_values)
+        for idx, value in zip(rerolled, rolled):
+            dice_values[idx] = value
+        state.dice_values = dice_values
+        state.rolls_left -= 1
+        return rolled
+
+    @timed(game_method_duration, "roll")
+    def roll(self, locked_dice: Optional[List[int]] = None) -> CachedGame:
         """
         Effectue un lancer de dés (ou une relance).
         """
         if not self.game and self.game_id is not None:
             self._load_game(self.game_id)
 
-        if self.state.rolls_left <= 0:
-            raise ValueError("No rolls left in this turn")
-
-        self._roll_dice(locked_dice)
-        self.state.rolls_left -= 1
+        rolled = self.apply_roll(self.state, locked_dice, self.dice)
 
-        self._save_state()
+        self._save_state("roll", {"locked_dice": locked_dice, "rolled": rolled})
         return self.game
 
     # ----------------------------------------------------------------------
     # Choix du score et passage au tour suivant
     # ----------------------------------------------------------------------
 
-    def choose_score(self, category: str) -> GameSession:
-        """
-        Attribue le score pour une catégorie et passe au tour suivant.
+    @classmethod
+    def apply_score(cls, state: RuntimeGameState, category: str) -> bool:
         """
-        if not self.game:
-            self._load_game(self.game_id)
+        Applique les règles du choix d'une catégorie à un état, sans accès à la base.
 
-        if category not in self.state.scores:
+        :param state: État de la partie, modifié sur place
+        :param category: Catégorie à marquer
+        :return: `True` si la partie est terminée
+        """
+        if category not in state.scores:
             raise ValueError("Invalid category")
-        if self.state.scores[category] is not None:
+        if state.scores[category] is not None:
             raise ValueError("Category already used")
 
-        dice = self.state.dice_values
-        points = self._calculate_score_for_category(category, dice)
+        points = cls._calculate_score_for_category(category, state.dice_values)
 
-        self.state.scores[category] = points
-        self.state.total_score += points
-        self.state.round += 1
+        state.scores[category] = points
+        state.total_score += points
+        state.round += 1
 
         # Fin de partie
-        if self.state.round >= len(self.state.scores):
-            self.state.rolls_left = 0
-            self.game.finished = 1
-        else:
-            self.state.rolls_left = 3
-            self.state.locked_dice = []
+        if state.round >= len(state.scores):
+            state.rolls_left = 0
+            return True
+        state.rolls_left = 3
+        state.locked_dice = []
+        return False
+
+    @timed(game_method_duration, "choose_score")
+    def choose_score(self, category: str) -> CachedGame:
+        """
+        Attribue le score pour une catégorie et passe au tour suivant.
+        """
+        if not self.game:
+            self._load_game(self.game_id)
+
+        finished = 1 if self.apply_score(self.state, category) else self.game.finished
 
-        self._save_state()
+        self._save_state("score", {"category": category}, finished)
         return self.game
 
     # ----------------------------------------------------------------------
     # Persistance & accès
     # ----------------------------------------------------------------------
 
-    def _save_state(self):
-        # Assurons-nous que l'état est sérialisé en dictionnaire
-        state_dict = {
-            "dice_values": self.state.dice_values,
-            "rolls_left": self.state.rolls_left,
-            "round": self.state.round,
-            "scores": self.state.scores,
-            "total_score": self.state.total_score,
-            "locked_dice": self.state.locked_dice,
-        }
-        self.game.state = state_dict
-        self.db.add(self.game)
-        self.db.commit()
-        self.db.refresh(self.game)
+    @classmethod
+    def replay(cls, state: RuntimeGameState, moves: List[tuple[str, dict]]) -> bool:
+        """
+        Rejoue des coups du journal sur un état avec les mêmes règles que `roll` / `choose_score`.
 
-    def get(self) -> GameSession:
+        :param state: État de départ (instantané), modifié sur place
+        :param moves: Coups `(kind, payload)` dans l'ordre du journal
+        :return: `True` si la partie est terminée
+        """
+        finished = False
+        for kind, payload in moves:
+            if kind == "roll":
+                cls.apply_roll(state, payload["locked_dice"], RecordedDiceSource(payload["rolled"]))
+            elif kind == "score":
+                finished = cls.apply_score(state, payload["category"])
+            else:
+                raise ValueError(f"Unknown move kind: {kind}")
+        return finished
+
+    def _replay_journal(self, game: GameSession) -> CachedGame:
+        """
+        Reconstruit l'état courant d'une partie : instantané `state` puis coups journalisés après celui-ci.
+        """
+        moves = (
+            self.db.query(GameMove.seq, GameMove.kind, GameMove.payload)
+            .filter(GameMove.game_id == game.id, GameMove.seq > game.journal_seq)
+            .order_by(GameMove.seq)
+            .all()
+        )
+        if not moves:
+            return CachedGame(game.id, game.user_id, game.created_at, game.state, game.finished, game.journal_seq)
+
+        state = RuntimeGameState.from_dict(game.state).copy()
+        finished = self.replay(state, [(move.kind, move.payload) for move in moves])
+        return CachedGame(
+            game.id,
+            game.user_id,
+            game.created_at,
+            state.to_dict(),
+            1 if finished else game.finished,
+            moves[-1].seq,
+            game.journal_seq,
+        )
+
+    @timed(game_method_duration, "_save_state")
+    def _save_state(self, kind: str, payload: dict, finished: Optional[int] = None):
+        """
+        Enregistre un coup puis met à jour le cache (écriture simultanée).
+
+        Avec le journal activé, le coup est ajouté au journal écrit en différé et l'instantané
+        `state` n'est réécrit que tous les `journal_snapshot_every` coups et en fin de partie.
+        Sinon, l'état est enregistré immédiatement en une seule requête UPDATE.
+        Une partie terminée sort du cache.
+
+        :raises ValueError: Si un autre coup a été enregistré depuis le chargement de la partie
+        :raises BufferError: Si le journal est plein
+        """
+        was_finished = self.game.finished
+        if finished is None:
+            finished = was_finished
+        seq = self.game.journal_seq + 1
+        snapshot_seq = self.game.snapshot_seq
+        # Copie sérialisable de l'état : l'état de travail peut encore être modifié par les coups suivants
+        state_dict = self.state.to_dict()
+        # Colonnes dénormalisées de l'instantané (classements)
+        columns = {"state": state_dict, "finished": finished, "total_score": self.state.total_score}
+        if finished and not was_finished:
+            columns["finished_at"] = datetime.utcnow()
+        game = CachedGame(self.game.id, self.game.user_id, self.game.created_at, state_dict, finished, seq, seq)
+        if settings.journal_enabled:
+            if finished or seq - snapshot_seq >= settings.journal_snapshot_every:
+                snapshot, snapshot_seq = columns, seq
+            else:
+                snapshot = None
+            game.snapshot_seq = snapshot_seq
+            # Coups sérialisés par partie : le coup n'est retenu que si personne n'a joué depuis le chargement
+            if not game_cache.replace(self.game, game):
+                raise ValueError("Game was modified by a concurrent move, reload it")
+            try:
+                move_journal.append(self.game.id, seq, kind, payload, snapshot)
+            except Exception:
+                game_cache.invalidate(self.game.id)
+                raise
+        else:
+            try:
+                updated = self.db.execute(
+                    update(GameSession)
+                    .where(GameSession.id == self.game.id, GameSession.journal_seq == self.game.snapshot_seq)
+                    .values(**columns, journal_seq=seq)
+                ).rowcount
+                if not updated:
+                    self.db.rollback()
+                    raise ValueError("Game was modified by a concurrent move, reload it")
+                self.db.commit()
+            except Exception:
+                game_cache.invalidate(self.game.id)
+                raise
+            game_cache.put(game)
+
+        self.game = game
+        if finished:
+            game_cache.invalidate(self.game.id)
+
+        _notify(game_move_listeners, kind, self.game)
+        if finished and not was_finished:
+            _notify(game_finished_listeners, self.game)
+
+    def sync(self) -> None:
+        """
+        Recharge la partie si l'instance n'a plus le dernier état connu : coup joué par une autre session
+        ou état de travail modifié par un coup dont l'enregistrement a échoué.
+        """
+        if game_cache.get(self.game.id) is not self.game or self.state != self.game.game_state:
+            self._load_game(self.game.id)
+
+    def get(self) -> CachedGame:
         """
         Retourne la partie courante.
         """
@@ -184,15 +359,68 @@ class Game:
         return self.game
 
     @staticmethod
-    def list_for_user(db: Session, user_id: int):
+    def list_for_user(
+        db: Session,
+        user_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        finished: Optional[int] = None,
+        include_state: bool = False,
+    ):
         """
-        Liste toutes les parties d'un utilisateur.
+        Liste les parties d'un utilisateur, des plus récentes aux plus anciennes, par pagination
+        sur `(created_at, id)`. Seules les colonnes utiles sont lues : `state` n'est chargé que sur demande.
+
+        Avec le journal activé, `state`, `finished` et `total_score` sont pris dans le cache des parties
+        en cours et dans les instantanés pas encore écrits, plus récents que la base. Une partie en cours
+        absente du cache de ce worker est listée dans son dernier instantané écrit (au plus
+        `journal_snapshot_every` coups de retard). Le filtre `finished` porte sur la base : les
+        instantanés de fin de partie en attente sont écrits avant la lecture.
+
+        :param limit: Taille de la page, ou `None` pour tout lister
+        :param cursor: Curseur de la page précédente (voir `utils.encode_cursor`)
+        :param finished: Filtre optionnel sur l'état de fin de partie (0 ou 1)
+        :param include_state: Inclure l'état JSON de chaque partie
         """
-        return (
-            db.query(GameSession)
-            .filter(GameSession.user_id == user_id)
-            .order_by(GameSession.created_at.desc())
-            .all()
+        columns = [
+            GameSession.id,
+            GameSession.user_id,
+            GameSession.created_at,
+            GameSession.finished,
+            GameSession.total_score,
+        ]
+        if include_state:
+            columns.append(GameSession.state)
+        query = db.query(*columns).filter(GameSession.user_id == user_id)
+        if finished is not None:
+            query = query.filter(GameSession.finished == finished)
+        if cursor is not None:
+            query = query.filter(tuple_(GameSession.created_at, GameSession.id) < decode_cursor(cursor))
+        query = query.order_by(GameSession.created_at.desc(), GameSession.id.desc())
+        if limit is not None:
+            query = query.limit(limit)
+        if finished is not None and settings.journal_enabled:
+            move_journal.flush()
+        rows = query.all()
+        if not settings.journal_enabled:
+            return rows
+        return [Game._overlay_pending(row, include_state) for row in rows]
+
+    @staticmethod
+    def _overlay_pending(row, include_state: bool):
+        """
+        Ligne de `list_for_user` avec l'état le plus récent connu du processus : cache, puis instantané en attente.
+        """
+        cached = game_cache.peek(row.id)
+        if cached is not None:
+            state, finished, total_score = cached.state, cached.finished, cached.game_state.total_score
+        else:
+            snapshot = move_journal.pending_snapshot(row.id)
+            if snapshot is None:
+                return row
+            state, finished, total_score = snapshot["state"], snapshot["finished"], snapshot["total_score"]
+        return GameListing(
+            row.id, row.user_id, row.created_at, finished, total_score, state if include_state else None
         )
 
     # ----------------------------------------------------------------------
@@ -227,6 +455,55 @@ class Game:
 
     @classmethod
     def _calculate_score_for_category(cls, category: str, dice: List[int]) -> int:
+        """
+        Retourne le score d'un lancer pour une catégorie par lecture dans la table précalculée.
+        Les lancers hors table (dés non lancés, valeurs hors 1..6) sont calculés directement.
+        """
+        column = CATEGORY_INDEX.get(category)
+        if column is None:
+            raise ValueError("Unknown category")
+        row = MULTISET_INDEX.get(tuple(sorted(dice)))
+        if row is None:
+            return cls._compute_score_for_category(category, dice)
+        return SCORE_TABLE[row * len(CATEGORIES) + column]
+
+    @classmethod
+    def score_batch(cls, dice: np.ndarray, category: Optional[str] = None) -> np.ndarray:
+        """
+        Calcule en bloc les scores d'un tableau de lancers, sans boucle Python par lancer.
+
+        :param dice: Tableau d'entiers (N x 5) de valeurs de dés entre 1 et 6
+        :param category: Catégorie à calculer, ou `None` pour toutes les catégories
+        :return: Tableau d'entiers N x 13 (colonnes dans l'ordre de `CategoriesEnum`),
+            ou de taille N si une catégorie est demandée
+        :raises ValueError: Si le tableau n'a pas cette forme ou contient d'autres valeurs
+        """
+        dice = np.asarray(dice)
+        if dice.ndim != 2 or dice.shape[1] != 5:
+            raise ValueError("Dice batch must have shape (N, 5)")
+        # Une valeur hors de 1..6 (ou non entière) donnerait une clé absente de la table, lue sans erreur
+        if not np.issubdtype(dice.dtype, np.integer):
+            raise ValueError("Dice values must be integers")
+        if dice.size and (dice.min() < 1 or dice.max() > 6):
+            raise ValueError("Dice values must be between 1 and 6")
+
+        # Histogramme des faces (N x 6), puis clé en base 6 de l'histogramme -> ligne de la table
+        counts = (dice[:, :, None] == _FACES).sum(axis=1)
+        rows = _HISTOGRAM_ROWS[counts @ _HISTOGRAM_WEIGHTS]
+        if category is None:
+            return _SCORE_MATRIX[rows].astype(np.int64)
+
+        column = CATEGORY_INDEX.get(category)
+        if column is None:
+            raise ValueError("Unknown category")
+        return _SCORE_MATRIX[rows, column].astype(np.int64)
+
+    @classmethod
+    def _compute_score_for_category(cls, category: str, dice: List[int]) -> int:
+        """
+        Calcule le score d'un lancer pour une catégorie à partir des règles.
+        Sert à construire la table de scores et de repli pour les lancers hors table.
+        """
         if category == "ones":
             return sum(d for d in dice if d == 1)
         if category == "twos":
@@ -254,3 +531,106 @@ class Game:
         if category == "chance":
             return sum(dice)
         raise ValueError("Unknown category")
+
+
+class AsyncGame:
+    """
+    Version asynchrone de `Game` pour les routes de l'API.
+    Les règles et la persistance de `Game` s'exécutent sur la connexion asynchrone via `run_sync`,
+    sans passer par le pool de threads.
+    """
+
+    db: AsyncSession
+    game_id: Optional[int]
+    dice: Optional[DiceSource]
+
+    def __init__(self, db: AsyncSession, game_id: Optional[int] = None, dice: Optional[DiceSource] = None):
+        self.db = db
+        self.game_id = game_id
+        self.dice = dice
+        self._game: Optional[Game] = None
+
+    async def _flush_journal(self) -> None:
+        """
+        Écrit hors de la boucle d'événements les coups en attente d'une partie qui doit être rechargée
+        depuis la base, pour que `Game._load_game` n'ait pas à le faire dans `run_sync`.
+        """
+        if self.game_id is not None and game_cache.get(self.game_id) is None and move_journal.has_pending(self.game_id):
+            await move_journal.flush_async()
+
+    async def bind(self) -> CachedGame:
+        """
+        Garde une instance de `Game` pour les appels suivants (partie jouée sur une connexion WebSocket) :
+        un coup réutilise l'état en mémoire au lieu de recharger la partie.
+        """
+        await self._flush_journal()
+        self._game = await self.db.run_sync(lambda session: Game(session, self.game_id, self.dice))
+        return self._game.game
+
+    async def _call(self, method: str, *args):
+        def call(session: Session):
+            if self._game is None:
+                return getattr(Game(session, self.game_id, self.dice), method)(*args)
+            self._game.sync()
+            return getattr(self._game, method)(*args)
+
+        await self._flush_journal()
+        return await self.db.run_sync(call)
+
+    async def start(self, user_id: int) -> CachedGame:
+        game = await self.db.run_sync(lambda session: Game(session, dice=self.dice).start(user_id))
+        self.game_id = game.id
+        return game
+
+    async def roll(self, locked_dice: Optional[List[int]] = None) -> CachedGame:
+        return await self._call("roll", locked_dice)
+
+    async def choose_score(self, category: str) -> CachedGame:
+        game = await self._call("choose_score", category)
+        if game.finished and settings.journal_enabled:
+            # Partie terminée : ses coups sont écrits sans attendre le thread du journal
+            await move_journal.flush_async()
+        return game
+
+    async def get(self) -> CachedGame:
+        return await self._call("get")
+
+    async def get_state(self) -> RuntimeGameState:
+        await self._flush_journal()
+        return await self.db.run_sync(lambda session: Game(session, self.game_id, self.dice).state)
+
+    @staticmethod
+    async def list_for_user(db: AsyncSession, user_id: int, **kwargs):
+        if kwargs.get("finished") is not None and settings.journal_enabled:
+            await move_journal.flush_async()
+        return await db.run_sync(Game.list_for_user, user_id, **kwargs)
+
+
+# ----------------------------------------------------------------------
+# Table de scores précalculée
+# ----------------------------------------------------------------------
+
+CATEGORIES: tuple[str, ...] = tuple(c.value for c in CategoriesEnum)
+CATEGORY_INDEX: Dict[str, int] = {category: idx for idx, category in enumerate(CATEGORIES)}
+
+# Les 252 multisets triés de 5 dés, et l'index de chacun dans la table
+DICE_MULTISETS: tuple[tuple[int, ...], ...] = tuple(itertools.combinations_with_replacement(range(1, 7), 5))
+MULTISET_INDEX: Dict[tuple[int, ...], int] = {dice: row for row, dice in enumerate(DICE_MULTISETS)}
+
+# Table compacte (252 x 13 octets) : SCORE_TABLE[row * 13 + column]
+SCORE_TABLE = array(
+    "B",
+    (Game._compute_score_for_category(category, list(dice)) for dice in DICE_MULTISETS for category in CATEGORIES),
+)
+
+# Vues NumPy de la table pour le calcul en bloc
+_FACES = np.arange(1, 7)
+_HISTOGRAM_WEIGHTS = 6 ** np.arange(6)
+_HISTOGRAM_ROWS = np.full(5 * 6**5 + 1, -1, dtype=np.int16)
+for _row, _dice in enumerate(DICE_MULTISETS):
+    _HISTOGRAM_ROWS[np.bincount(_dice, minlength=7)[1:] @ _HISTOGRAM_WEIGHTS] = _row
+del _row, _dice
+_SCORE_MATRIX = np.frombuffer(SCORE_TABLE, dtype=np.uint8).reshape(len(DICE_MULTISETS), len(CATEGORIES))
+
+# Score total maximal d'une partie : meilleur score possible dans chaque catégorie
+MAX_TOTAL_SCORE = int(_SCORE_MATRIX.max(axis=0).sum())
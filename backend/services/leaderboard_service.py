@@ -0,0 +1,363 @@
+"""
+Fichier de gestion des classements des parties terminées
+"""
+
+from datetime import datetime
+from typing import Callable, Hashable, Optional
+import bisect
+import json
+import logging
+import threading
+
+from sqlalchemy import JSON, type_coerce
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal
+from db.models import GameSession, User
+from managers.broker import Broker, get_broker
+from services.game_cache import CachedGame
+from services.game_service import MAX_TOTAL_SCORE, game_finished_listeners
+
+logger = logging.getLogger(__name__)
+
+# Salon du broker des événements du classement (les salons des parties sont leurs IDs entiers)
+LEADERBOARD_ROOM = "leaderboard"
+# Utilisateurs supprimés par événement, pour rester sous la taille d'un datagramme du broker "unix"
+USERS_PER_EVENT = 1000
+
+
+def top_games(db: Session, limit: int = 10, user_id: Optional[int] = None) -> list:
+    """
+    Meilleures parties terminées, globalement ou pour un utilisateur
+
+    :param db: Session de la base de données
+    :param limit: Nombre de parties retournées
+    :param user_id: ID de l'utilisateur, ou `None` pour le classement global
+    """
+    query = (
+        db.query(
+            GameSession.id.label("game_id"),
+            GameSession.user_id,
+            User.username,
+            GameSession.total_score,
+            GameSession.finished_at,
+        )
+        .join(User, User.id == GameSession.user_id)
+        .filter(GameSession.finished == 1)
+    )
+    if user_id is not None:
+        query = query.filter(GameSession.user_id == user_id)
+    return query.order_by(GameSession.total_score.desc(), GameSession.id).limit(limit).all()
+
+
+def game_score(db: Session, game_id: int) -> int:
+    """
+    Score total d'une partie terminée
+
+    :raises ValueError: Si la partie n'existe pas ou n'est pas terminée
+    """
+    game = db.query(GameSession.total_score, GameSession.finished).filter(GameSession.id == game_id).first()
+    if game is None:
+        raise ValueError("Game not found")
+    if not game.finished:
+        raise ValueError("Game is not finished")
+    return game.total_score
+
+
+def usernames(db: Session, user_ids: list[int]) -> dict[int, str]:
+    """
+    Noms des utilisateurs demandés, en une requête
+    """
+    if not user_ids:
+        return {}
+    return dict(db.query(User.id, User.username).filter(User.id.in_(user_ids)).all())
+
+
+# ----------------------------------------------------------------------
+# Classement en mémoire, tenu à jour par les fins de partie
+# ----------------------------------------------------------------------
+
+
+class UserStats:
+    games: int
+    total: int
+    best: int
+    yahtzees: int
+
+    def __init__(self):
+        self.games = 0
+        self.total = 0
+        self.best = 0
+        self.yahtzees = 0
+
+
+class Leaderboard:
+    """
+    Classement des parties terminées, chargé depuis la base au démarrage puis mis à jour
+    à chaque fin de partie :
+
+    - histogramme des scores totaux (bornés par `MAX_TOTAL_SCORE`) en arbre de Fenwick,
+      pour le rang d'un score en O(log n) ;
+    - `top_size` meilleures parties, triées ;
+    - agrégats par utilisateur et liste triée des meilleurs scores par utilisateur.
+
+    Chaque worker tient son propre classement : les fins de partie et les suppressions d'utilisateurs
+    sont diffusées par le broker (`WS_BROKER`) et appliquées par tous les workers, y compris celui qui les publie.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], top_size: int, broker: Optional[Broker] = None):
+        """
+        :param session_factory: Constructeur de sessions utilisé pour le chargement
+        :param top_size: Nombre de meilleures parties gardées
+        :param broker: Broker de diffusion des événements du classement entre workers
+        """
+        self.session_factory = session_factory
+        self.top_size = top_size
+        self.broker = broker
+        self._lock = threading.RLock()
+        self._warm_lock = threading.Lock()
+        # Fins de partie reçues pendant un chargement, rejouées sur le nouveau classement
+        self._received: Optional[list[tuple]] = None
+        self._stale = False
+        self._rebuild_thread: Optional[threading.Thread] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._tree = [0] * (MAX_TOTAL_SCORE + 2)
+        self.games = 0
+        self._top: list[tuple[int, int, int, datetime]] = []  # (-score, game_id, user_id, finished_at)
+        self._users: dict[int, UserStats] = {}
+        self._user_ranking: list[tuple[int, int]] = []  # (-meilleur score, user_id)
+
+    # ----------------------------------------------------------------------
+    # Mise à jour
+    # ----------------------------------------------------------------------
+
+    def add_game(self, game_id: int, user_id: int, total_score: int, yahtzee: bool, finished_at: datetime) -> None:
+        score = min(max(total_score, 0), MAX_TOTAL_SCORE)
+        with self._lock:
+            if self._received is not None:
+                self._received.append((game_id, user_id, total_score, yahtzee, finished_at))
+            index = score + 1
+            while index < len(self._tree):
+                self._tree[index] += 1
+                index += index & -index
+            self.games += 1
+
+            entry = (-score, game_id, user_id, finished_at)
+            if len(self._top) < self.top_size or entry < self._top[-1]:
+                bisect.insort(self._top, entry)
+                del self._top[self.top_size :]
+
+            stats = self._users.get(user_id)
+            if stats is None:
+                stats = self._users[user_id] = UserStats()
+            elif score > stats.best:
+                del self._user_ranking[bisect.bisect_left(self._user_ranking, (-stats.best, user_id))]
+            if stats.games == 0 or score > stats.best:
+                stats.best = score
+                bisect.insort(self._user_ranking, (-score, user_id))
+            stats.games += 1
+            stats.total += score
+            stats.yahtzees += int(yahtzee)
+
+    def remove_users(self, user_ids: list[int]) -> None:
+        """
+        Retire tout de suite les utilisateurs supprimés des agrégats par utilisateur et des meilleures parties,
+        puis reconstruit le classement dans un thread (histogramme des scores, places libérées du top).
+        """
+        removed = set(user_ids)
+        with self._lock:
+            for user_id in removed:
+                stats = self._users.pop(user_id, None)
+                if stats is not None:
+                    del self._user_ranking[bisect.bisect_left(self._user_ranking, (-stats.best, user_id))]
+            self._top = [entry for entry in self._top if entry[2] not in removed]
+            self._stale = True
+            if self._rebuild_thread is None:
+                self._rebuild_thread = threading.Thread(target=self._rebuild, name="leaderboard-rebuild", daemon=True)
+                self._rebuild_thread.start()
+
+    def _rebuild(self) -> None:
+        # Une suppression reçue pendant un chargement en relance un : la requête a pu la précéder
+        while True:
+            with self._lock:
+                if not self._stale:
+                    self._rebuild_thread = None
+                    return
+                self._stale = False
+            try:
+                self.warm()
+            except Exception:
+                logger.exception("Leaderboard rebuild failed")
+
+    def warm(self) -> None:
+        """
+        (Re)charge le classement depuis les parties terminées en base, sans bloquer les lectures :
+        le nouveau classement est construit à part puis remplace l'ancien. Les fins de partie reçues
+        pendant le chargement et absentes de la requête y sont ajoutées.
+        Avec l'état stocké en JSON, le score Yahtzee est extrait en SQL ; au format compact, l'état est décodé.
+        """
+        with self._warm_lock:
+            with self._lock:
+                self._received = []
+            board = Leaderboard(self.session_factory, self.top_size)
+            loaded: set[int] = set()
+            db = self.session_factory()
+            try:
+                if settings.state_storage == "json":
+                    yahtzee = type_coerce(GameSession.state, JSON)[("scores", "yahtzee")].as_integer()
+                else:
+                    yahtzee = GameSession.state
+                rows = (
+                    db.query(
+                        GameSession.id, GameSession.user_id, GameSession.total_score, yahtzee, GameSession.finished_at
+                    )
+                    .filter(GameSession.finished == 1)
+                    .yield_per(10000)
+                )
+                for game_id, user_id, total_score, yahtzee_points, finished_at in rows:
+                    if isinstance(yahtzee_points, dict):
+                        yahtzee_points = yahtzee_points["scores"].get("yahtzee")
+                    board.add_game(game_id, user_id, total_score or 0, bool(yahtzee_points), finished_at)
+                    loaded.add(game_id)
+            except Exception:
+                with self._lock:
+                    self._received = None
+                raise
+            finally:
+                db.close()
+
+            with self._lock:
+                for game in self._received:
+                    if game[0] not in loaded:
+                        board.add_game(*game)
+                self._received = None
+                self._tree, self.games, self._top = board._tree, board.games, board._top
+                self._users, self._user_ranking = board._users, board._user_ranking
+
+    # ----------------------------------------------------------------------
+    # Diffusion entre workers
+    # ----------------------------------------------------------------------
+
+    def _publish(self, event: dict) -> None:
+        if self.broker is None:
+            self.on_event(LEADERBOARD_ROOM, json.dumps(event))
+        else:
+            self.broker.publish(LEADERBOARD_ROOM, json.dumps(event))
+
+    def on_game_finished(self, game: CachedGame) -> None:
+        """
+        Abonné aux fins de partie de `Game` : diffuse la partie à classer à tous les workers.
+        """
+        state = game.game_state
+        self._publish(
+            {
+                "type": "finished",
+                "game_id": game.id,
+                "user_id": game.user_id,
+                "total_score": state.total_score,
+                "yahtzee": bool(state.scores.get("yahtzee")),
+                "finished_at": datetime.utcnow().isoformat(),
+            }
+        )
+
+    def users_deleted(self, user_ids: list[int]) -> None:
+        """
+        Diffuse la suppression d'utilisateurs (et de leurs parties) à tous les workers.
+        """
+        for offset in range(0, len(user_ids), USERS_PER_EVENT):
+            self._publish({"type": "users_deleted", "user_ids": user_ids[offset : offset + USERS_PER_EVENT]})
+
+    def on_event(self, room: Hashable, message: str) -> None:
+        """
+        Abonné au broker : applique un événement du classement publié par n'importe quel worker.
+        """
+        if room != LEADERBOARD_ROOM:
+            return
+        event = json.loads(message)
+        if event["type"] == "finished":
+            self.add_game(
+                event["game_id"],
+                event["user_id"],
+                event["total_score"],
+                event["yahtzee"],
+                datetime.fromisoformat(event["finished_at"]),
+            )
+        elif event["type"] == "users_deleted":
+            self.remove_users(event["user_ids"])
+
+    # ----------------------------------------------------------------------
+    # Lectures
+    # ----------------------------------------------------------------------
+
+    def rank_of_score(self, score: int) -> tuple[int, int]:
+        """
+        Rang d'un score total parmi les parties terminées (1 = meilleur), en O(log n).
+
+        :return: `(rang, nombre de parties classées)`
+        """
+        with self._lock:
+            index, at_most = min(max(score, 0), MAX_TOTAL_SCORE) + 1, 0
+            while index > 0:
+                at_most += self._tree[index]
+                index -= index & -index
+            return self.games - at_most + 1, self.games
+
+    def top_games(self, limit: int) -> list[dict]:
+        """
+        Meilleures parties terminées.
+        """
+        with self._lock:
+            return [
+                {"game_id": game_id, "user_id": user_id, "total_score": -score, "finished_at": finished_at}
+                for score, game_id, user_id, finished_at in self._top[:limit]
+            ]
+
+    def top_users(self, limit: int) -> list[dict]:
+        """
+        Agrégats des utilisateurs classés par meilleur score.
+        """
+        with self._lock:
+            return [self.user_stats(user_id) for _, user_id in self._user_ranking[:limit]]
+
+    def user_stats(self, user_id: int) -> Optional[dict]:
+        """
+        Agrégats d'un utilisateur, avec son rang par meilleur score.
+        """
+        with self._lock:
+            stats = self._users.get(user_id)
+            if stats is None:
+                return None
+            return {
+                "user_id": user_id,
+                "games": stats.games,
+                "best_score": stats.best,
+                "mean_score": stats.total / stats.games,
+                "yahtzees": stats.yahtzees,
+                "rank": bisect.bisect_left(self._user_ranking, (-stats.best, user_id)) + 1,
+            }
+
+
+leaderboard = Leaderboard(SessionLocal, settings.leaderboard_top_size, get_broker())
+game_finished_listeners.append(leaderboard.on_game_finished)
+leaderboard.broker.subscribe(leaderboard.on_event)
+
+
+# ----------------------------------------------------------------------
+# Versions asynchrones (exécutées sur la connexion asynchrone via `run_sync`)
+# ----------------------------------------------------------------------
+
+
+async def top_games_async(db: AsyncSession, limit: int = 10, user_id: Optional[int] = None) -> list:
+    return await db.run_sync(top_games, limit, user_id)
+
+
+async def game_score_async(db: AsyncSession, game_id: int) -> int:
+    return await db.run_sync(game_score, game_id)
+
+
+async def usernames_async(db: AsyncSession, user_ids: list[int]) -> dict[int, str]:
+    return await db.run_sync(usernames, user_ids)
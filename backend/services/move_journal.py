@@ -0,0 +1,221 @@
+"""
+Fichier de gestion du journal des coups, écrit en différé par lots
+"""
+
+from datetime import datetime
+from typing import Callable, Optional
+import asyncio
+import logging
+import threading
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal
+from db.models import GameMove, GameSession
+from services.game_cache import game_cache
+
+logger = logging.getLogger(__name__)
+
+
+class MoveJournal:
+    """
+    Tampon des coups joués, écrit en base par lots dans une seule transaction :
+    insertion groupée dans `game_moves` et compaction des instantanés `GameSession.state`.
+
+    Le numéro de chaque coup est déduit de l'état en mémoire du processus : le journal suppose un seul
+    worker (voir `JOURNAL_ENABLED`). Si la base refuse malgré tout les coups d'une partie (numéro déjà pris,
+    partie supprimée), ils ne peuvent pas être réessayés : ils sont journalisés en erreur, la partie sort du
+    cache et le prochain coup ou chargement de la partie échoue pour prévenir le joueur.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], flush_interval: float, max_pending: int):
+        """
+        :param session_factory: Constructeur de sessions utilisé pour les écritures
+        :param flush_interval: Intervalle en secondes entre deux écritures du thread de fond
+        :param max_pending: Nombre maximal de coups en attente d'écriture
+        """
+        self.session_factory = session_factory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._moves: list[dict] = []
+        self._snapshots: dict[int, dict] = {}
+        # Numéro du dernier coup en attente, par partie
+        self._last_seq: dict[int, int] = {}
+        # Parties dont des coups déjà acceptés ont été refusés par la base, et nombre de ces coups
+        self._rejected: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def append(self, game_id: int, seq: int, kind: str, payload: dict, snapshot: Optional[dict] = None) -> None:
+        """
+        Ajoute un coup au tampon, avec l'instantané de la partie s'il doit être compacté.
+
+        :param snapshot: Colonnes de `GameSession` à réécrire après ce coup (`state`, `finished`, ...)
+        :raises ValueError: Si le coup ne suit pas le dernier coup en attente de la partie,
+            ou si des coups précédents de la partie ont été refusés par la base
+        :raises BufferError: Si le tampon est plein (base indisponible)
+        """
+        self.check_rejected(game_id)
+        with self._lock:
+            last = self._last_seq.get(game_id)
+            if last is not None and seq != last + 1:
+                raise ValueError("Game was modified by a concurrent move, reload it")
+            if len(self._moves) >= self.max_pending:
+                raise BufferError("Move journal is full")
+            self._moves.append(
+                {"game_id": game_id, "seq": seq, "kind": kind, "payload": payload, "created_at": datetime.utcnow()}
+            )
+            if snapshot is not None:
+                self._snapshots[game_id] = {"id": game_id, "journal_seq": seq, **snapshot}
+            self._last_seq[game_id] = seq
+
+    def check_rejected(self, game_id: int) -> None:
+        """
+        Signale une seule fois au joueur que des coups acceptés de la partie n'ont pas pu être écrits.
+
+        :raises ValueError: Si des coups de la partie ont été refusés par la base depuis le dernier appel
+        """
+        with self._lock:
+            count = self._rejected.pop(game_id, None)
+        if count is not None:
+            raise ValueError(f"{count} moves of this game could not be saved and were lost, reload it")
+
+    def has_pending(self, game_id: int) -> bool:
+        """
+        Indique si des coups de la partie ne sont pas encore écrits en base.
+        """
+        with self._lock:
+            return game_id in self._last_seq
+
+    def pending_snapshot(self, game_id: int) -> Optional[dict]:
+        """
+        Colonnes de `GameSession` pas encore réécrites pour la partie, ou `None`.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(game_id)
+            return dict(snapshot) if snapshot is not None else None
+
+    @staticmethod
+    def _write(db: Session, moves: list[dict], snapshots: list[dict]) -> None:
+        if moves:
+            db.execute(insert(GameMove), moves)
+        if snapshots:
+            db.execute(update(GameSession), snapshots)
+        db.commit()
+
+    def _write_each(self, db: Session, moves: list[dict], snapshots: dict[int, dict], written: set[int]) -> list[int]:
+        """
+        Écrit les coups partie par partie, une transaction chacune, pour isoler celles que la base refuse.
+
+        :param written: Complété avec les parties écrites (ou refusées), à ne pas remettre dans le tampon
+        :return: Parties dont les coups ont été refusés
+        """
+        by_game: dict[int, list[dict]] = {}
+        for move in moves:
+            by_game.setdefault(move["game_id"], []).append(move)
+        for game_id in snapshots.keys() - by_game.keys():
+            by_game[game_id] = []
+
+        rejected = []
+        for game_id, game_moves in by_game.items():
+            snapshot = [snapshots[game_id]] if game_id in snapshots else []
+            try:
+                self._write(db, game_moves, snapshot)
+            except IntegrityError as e:
+                db.rollback()
+                logger.error(
+                    "Database rejected %d journaled moves of game %d (%s), moves: %r",
+                    len(game_moves),
+                    game_id,
+                    e.orig,
+                    [(move["seq"], move["kind"], move["payload"]) for move in game_moves],
+                )
+                rejected.append(game_id)
+                with self._lock:
+                    self._rejected[game_id] = self._rejected.get(game_id, 0) + len(game_moves)
+            written.add(game_id)
+        return rejected
+
+    def flush(self) -> None:
+        """
+        Écrit les coups et instantanés en attente dans une seule transaction, sur une session synchrone dédiée.
+        Si la base refuse le lot, chaque partie est écrite séparément ; les parties en conflit sortent du cache
+        et leur prochain coup ou chargement échoue (voir `check_rejected`). Sur toute autre erreur,
+        les coups sont remis en tête du tampon pour la prochaine écriture.
+
+        Jamais sur la session d'une requête : exécutée dans `run_sync`, chaque requête SQL rendrait la main
+        à la boucle d'événements avec `_flush_lock` pris, et une autre coroutine du même thread qui appelle
+        `flush` bloquerait le thread (et le worker) indéfiniment.
+        """
+        with self._flush_lock:
+            with self._lock:
+                moves, self._moves = self._moves, []
+                snapshots, self._snapshots = self._snapshots, {}
+            if not moves and not snapshots:
+                return
+
+            rejected: list[int] = []
+            written: set[int] = set()
+            db = self.session_factory()
+            try:
+                try:
+                    self._write(db, moves, list(snapshots.values()))
+                except IntegrityError:
+                    db.rollback()
+                    rejected = self._write_each(db, moves, snapshots, written)
+            except Exception:
+                db.rollback()
+                with self._lock:
+                    self._moves = [move for move in moves if move["game_id"] not in written] + self._moves
+                    unwritten = {game_id: row for game_id, row in snapshots.items() if game_id not in written}
+                    self._snapshots = {**unwritten, **self._snapshots}
+                raise
+            finally:
+                db.close()
+
+            with self._lock:
+                self._last_seq = {}
+                for move in self._moves:
+                    self._last_seq[move["game_id"]] = move["seq"]
+            for game_id in rejected:
+                game_cache.invalidate(game_id)
+
+    async def flush_async(self) -> None:
+        """
+        `flush` depuis une coroutine, dans un thread : la boucle d'événements n'attend ni le verrou ni la base.
+        """
+        await asyncio.to_thread(self.flush)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Move journal flush failed")
+
+    def start(self) -> None:
+        """
+        Démarre le thread d'écriture périodique.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="move-journal", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Arrête le thread d'écriture et vide le tampon.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+move_journal = MoveJournal(SessionLocal, settings.journal_flush_interval, settings.journal_max_pending)
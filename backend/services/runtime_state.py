@@ -0,0 +1,86 @@
+"""
+Fichier de définition de l'état d'une partie utilisé en mémoire par `Game`
+"""
+
+from typing import Optional
+
+
+class RuntimeGameState:
+    """
+    État mutable d'une partie, sans validation : mêmes attributs que `db.schemas.GameState`.
+
+    Les règles (`Game.apply_roll`, `Game.apply_score`), le solveur et le simulateur travaillent sur
+    cet objet. Il n'est jamais converti en schéma pydantic : l'API sérialise sa copie au format
+    dictionnaire (`to_dict`, conservée dans `CachedGame.state`).
+    """
+
+    __slots__ = ("dice_values", "rolls_left", "round", "scores", "total_score", "locked_dice")
+
+    dice_values: list[int]
+    rolls_left: int
+    round: int
+    scores: dict[str, Optional[int]]
+    total_score: int
+    locked_dice: list[int]
+
+    def __init__(
+        self,
+        dice_values: list[int],
+        rolls_left: int,
+        round: int,
+        scores: dict[str, Optional[int]],
+        total_score: int,
+        locked_dice: Optional[list[int]] = None,
+    ):
+        self.dice_values = dice_values
+        self.rolls_left = rolls_left
+        self.round = round
+        self.scores = scores
+        self.total_score = total_score
+        self.locked_dice = locked_dice if locked_dice is not None else []
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RuntimeGameState":
+        """
+        Construit l'état depuis le format de `GameSession.state`, en partageant ses listes et son dictionnaire.
+        """
+        return cls(
+            state["dice_values"],
+            state["rolls_left"],
+            state["round"],
+            state["scores"],
+            state["total_score"],
+            state.get("locked_dice"),
+        )
+
+    def to_dict(self) -> dict:
+        """
+        Copie de l'état au format de `GameSession.state`.
+        """
+        return {
+            "dice_values": list(self.dice_values),
+            "rolls_left": self.rolls_left,
+            "round": self.round,
+            "scores": dict(self.scores),
+            "total_score": self.total_score,
+            "locked_dice": list(self.locked_dice),
+        }
+
+    def copy(self) -> "RuntimeGameState":
+        return RuntimeGameState(
+            list(self.dice_values),
+            self.rolls_left,
+            self.round,
+            dict(self.scores),
+            self.total_score,
+            list(self.locked_dice),
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RuntimeGameState):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"RuntimeGameState({fields})"
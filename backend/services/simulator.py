@@ -0,0 +1,203 @@
+"""
+Fichier de simulation Monte Carlo de parties complètes, en mémoire et sans base de données
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Optional
+import argparse
+import os
+import random
+
+import numpy as np
+
+from db.schemas import Hint
+from services.dice import DiceSource, FastDiceSource
+from services.game_service import CATEGORIES, MAX_TOTAL_SCORE, Game
+from services.runtime_state import RuntimeGameState
+from services.solver import get_solver
+
+Strategy = Callable[[RuntimeGameState], Hint]
+
+# ----------------------------------------------------------------------
+# Stratégies
+# ----------------------------------------------------------------------
+
+
+def random_strategy(rng: random.Random) -> Strategy:
+    """
+    Lance une fois puis marque une catégorie libre au hasard.
+    """
+
+    def play(state: RuntimeGameState) -> Hint:
+        if state.rolls_left >= 3:
+            return Hint(action="roll", expected_score=0)
+        open_categories = [c for c in CATEGORIES if state.scores[c] is None]
+        return Hint(action="score", category=rng.choice(open_categories), expected_score=0)
+
+    return play
+
+
+def greedy_strategy(rng: random.Random) -> Strategy:
+    """
+    Lance une fois puis marque la catégorie libre qui rapporte le plus de points immédiatement.
+    """
+
+    def play(state: RuntimeGameState) -> Hint:
+        if state.rolls_left >= 3:
+            return Hint(action="roll", expected_score=0)
+        category = max(
+            (c for c in CATEGORIES if state.scores[c] is None),
+            key=lambda c: Game._calculate_score_for_category(c, state.dice_values),
+        )
+        return Hint(action="score", category=category, expected_score=0)
+
+    return play
+
+
+def optimal_strategy(rng: random.Random) -> Strategy:
+    """
+    Joue l'action d'espérance maximale donnée par le solveur.
+    """
+    return get_solver().best_action
+
+
+# Stratégies disponibles, construites dans chaque processus à partir d'un générateur dédié
+STRATEGIES: dict[str, Callable[[random.Random], Strategy]] = {
+    "random": random_strategy,
+    "greedy": greedy_strategy,
+    "optimal": optimal_strategy,
+}
+
+# ----------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------
+
+
+class SimulationReport:
+    """
+    Distribution agrégée des scores d'un ensemble de parties.
+    """
+
+    games: int
+    histogram: np.ndarray  # nombre de parties par score total (0..MAX_TOTAL_SCORE)
+    category_totals: np.ndarray  # somme des points marqués par catégorie
+    yahtzees: int
+
+    def __init__(self):
+        self.games = 0
+        self.histogram = np.zeros(MAX_TOTAL_SCORE + 1, dtype=np.int64)
+        self.category_totals = np.zeros(len(CATEGORIES), dtype=np.int64)
+        self.yahtzees = 0
+
+    def add_game(self, state: RuntimeGameState) -> None:
+        self.games += 1
+        self.histogram[state.total_score] += 1
+        for idx, category in enumerate(CATEGORIES):
+            self.category_totals[idx] += state.scores[category]
+        if state.scores["yahtzee"]:
+            self.yahtzees += 1
+
+    def merge(self, other: "SimulationReport") -> None:
+        self.games += other.games
+        self.histogram += other.histogram
+        self.category_totals += other.category_totals
+        self.yahtzees += other.yahtzees
+
+    @property
+    def mean(self) -> float:
+        return float(np.arange(MAX_TOTAL_SCORE + 1) @ self.histogram / self.games)
+
+    @property
+    def std(self) -> float:
+        scores = np.arange(MAX_TOTAL_SCORE + 1)
+        return float(np.sqrt(((scores - self.mean) ** 2) @ self.histogram / self.games))
+
+    def percentile(self, q: float) -> int:
+        """
+        Score total en dessous duquel se trouvent `q` % des parties.
+        """
+        cumulative = np.cumsum(self.histogram)
+        return int(np.searchsorted(cumulative, q / 100 * self.games))
+
+    def summary(self) -> dict:
+        return {
+            "games": self.games,
+            "mean": self.mean,
+            "std": self.std,
+            "p5": self.percentile(5),
+            "median": self.percentile(50),
+            "p95": self.percentile(95),
+            "yahtzee_rate": self.yahtzees / self.games,
+            "category_means": dict(zip(CATEGORIES, (self.category_totals / self.games).tolist())),
+        }
+
+
+def play_game(strategy: Strategy, dice: DiceSource) -> RuntimeGameState:
+    """
+    Joue une partie complète avec les mêmes règles que `Game.roll` / `Game.choose_score`.
+    """
+    state = Game.new_state()
+    finished = False
+    while not finished:
+        hint = strategy(state)
+        if hint.action == "roll":
+            Game.apply_roll(state, hint.locked_dice if state.rolls_left < 3 else None, dice)
+        else:
+            finished = Game.apply_score(state, hint.category)
+    return state
+
+
+def _run_shard(strategy_name: str, games: int, seed: int) -> SimulationReport:
+    """
+    Joue un lot de parties dans un processus, avec des générateurs initialisés par la graine du lot.
+    """
+    rng = random.Random(seed)
+    strategy = STRATEGIES[strategy_name](rng)
+    dice = FastDiceSource(rng.getrandbits(64))
+    report = SimulationReport()
+    for _ in range(games):
+        report.add_game(play_game(strategy, dice))
+    return report
+
+
+def simulate(
+    games: int,
+    strategy: str = "optimal",
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    shard_size: int = 1000,
+) -> SimulationReport:
+    """
+    Simule des parties en les répartissant par lots sur un pool de processus.
+    Chaque lot reçoit sa propre graine dérivée de `seed` : le résultat ne dépend pas du nombre de processus.
+
+    :param games: Nombre de parties à jouer
+    :param strategy: Nom d'une stratégie de `STRATEGIES`
+    :param workers: Nombre de processus (par défaut, le nombre de CPU)
+    :param seed: Graine globale, pour des simulations reproductibles
+    :param shard_size: Nombre de parties par lot
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy: {strategy}")
+
+    shards = [min(shard_size, games - start) for start in range(0, games, shard_size)]
+    seeds = [int(s.generate_state(1)[0]) for s in np.random.SeedSequence(seed).spawn(len(shards))]
+
+    report = SimulationReport()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for shard_report in executor.map(_run_shard, [strategy] * len(shards), shards, seeds):
+            report.merge(shard_report)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simule des parties de Yahtzee et agrège la distribution des scores")
+    parser.add_argument("--games", type=int, default=10000, help="Nombre de parties")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="optimal", help="Stratégie jouée")
+    parser.add_argument("--workers", type=int, default=None, help="Nombre de processus")
+    parser.add_argument("--seed", type=int, default=None, help="Graine globale")
+    args = parser.parse_args()
+
+    result = simulate(args.games, args.strategy, args.workers, args.seed)
+    for key, value in result.summary().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,305 @@
+"""
+Fichier de calcul de la stratégie optimale (espérance de score maximale) d'une partie de Yahtzee solo
+"""
+
+from functools import lru_cache
+from math import factorial, prod
+from pathlib import Path
+from typing import Optional
+import argparse
+import hashlib
+import itertools
+import logging
+import os
+import struct
+import threading
+
+import numpy as np
+
+from core.config import settings
+from db.schemas import Hint
+from services.game_service import CATEGORIES, DICE_MULTISETS, MULTISET_INDEX, SCORE_TABLE
+from services.runtime_state import RuntimeGameState
+
+N_CATEGORIES = len(CATEGORIES)
+FULL_MASK = (1 << N_CATEGORIES) - 1
+
+logger = logging.getLogger(__name__)
+
+# ----------------------------------------------------------------------
+# Graphe de transition garder / relancer (construit une seule fois)
+# ----------------------------------------------------------------------
+
+# Les 462 sous-multisets de 0 à 5 dés pouvant être gardés avant une relance
+KEEPS: tuple[tuple[int, ...], ...] = tuple(
+    keep for size in range(6) for keep in itertools.combinations_with_replacement(range(1, 7), size)
+)
+KEEP_INDEX: dict[tuple[int, ...], int] = {keep: idx for idx, keep in enumerate(KEEPS)}
+
+
+def _roll_probability(outcome: tuple[int, ...]) -> float:
+    """
+    Probabilité d'obtenir un multiset donné en lançant len(outcome) dés.
+    """
+    counts = [outcome.count(face) for face in range(1, 7)]
+    return factorial(len(outcome)) / prod(factorial(c) for c in counts) / 6 ** len(outcome)
+
+
+def _build_transitions() -> np.ndarray:
+    """
+    Matrice (462 x 252) des probabilités d'atteindre chaque lancer final depuis chaque ensemble gardé.
+    """
+    transitions = np.zeros((len(KEEPS), len(DICE_MULTISETS)))
+    for k, keep in enumerate(KEEPS):
+        for outcome in itertools.combinations_with_replacement(range(1, 7), 5 - len(keep)):
+            row = MULTISET_INDEX[tuple(sorted(keep + outcome))]
+            transitions[k, row] += _roll_probability(outcome)
+    return transitions
+
+
+def _build_sub_keeps() -> np.ndarray:
+    """
+    Pour chaque lancer (252), les index des ensembles qu'il est possible d'en garder,
+    complétés par répétition jusqu'à 32 colonnes pour former un tableau rectangulaire.
+    """
+    sub_keeps = np.zeros((len(DICE_MULTISETS), 32), dtype=np.int16)
+    for row, dice in enumerate(DICE_MULTISETS):
+        keeps = sorted(
+            {KEEP_INDEX[keep] for size in range(6) for keep in itertools.combinations(dice, size)}
+        )
+        sub_keeps[row] = keeps + [keeps[0]] * (32 - len(keeps))
+    return sub_keeps
+
+
+TRANSITIONS = _build_transitions()
+SUB_KEEPS = _build_sub_keeps()
+EMPTY_KEEP = KEEP_INDEX[()]
+_SCORES = np.frombuffer(SCORE_TABLE, dtype=np.uint8).reshape(len(DICE_MULTISETS), N_CATEGORIES).astype(np.float64)
+_BITS = 1 << np.arange(N_CATEGORIES)
+
+
+def open_mask(scores: dict[str, Optional[int]]) -> int:
+    """
+    Encode les catégories encore libres en masque de bits (bit i = CATEGORIES[i] libre).
+    """
+    return sum(1 << idx for idx, category in enumerate(CATEGORIES) if scores.get(category) is None)
+
+
+# ----------------------------------------------------------------------
+# Espérances d'un tour (vectorisées sur un lot de masques)
+# ----------------------------------------------------------------------
+
+
+def _final_values(masks: np.ndarray, future: np.ndarray) -> np.ndarray:
+    """
+    Valeur (M x 252) de chaque lancer final : meilleur score d'une catégorie libre + espérance restante.
+    """
+    is_open = (masks[:, None] & _BITS) != 0
+    after = future[masks[:, None] & ~_BITS]
+    values = _SCORES[None, :, :] + after[:, None, :]
+    return np.where(is_open[:, None, :], values, -np.inf).max(axis=2)
+
+
+def _reroll(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Remonte d'une relance : espérance de chaque ensemble gardé (M x 462)
+    puis valeur de chaque lancer en gardant le meilleur sous-ensemble (M x 252).
+    """
+    expected = values @ TRANSITIONS.T
+    return expected, expected[:, SUB_KEEPS].max(axis=2)
+
+
+def build_future_values(chunk_size: int = 256) -> np.ndarray:
+    """
+    Calcule l'espérance de score restante en début de tour pour chacun des 2^13 masques de catégories libres.
+    Les masques sont traités par nombre de catégories libres croissant, chacun ne dépendant que des précédents.
+
+    :param chunk_size: Nombre de masques traités par lot
+    :return: Tableau float64 indexé par masque
+    """
+    future = np.zeros(FULL_MASK + 1)
+    all_masks = np.arange(FULL_MASK + 1)
+    popcounts = np.array([bin(mask).count("1") for mask in range(FULL_MASK + 1)])
+    for size in range(1, N_CATEGORIES + 1):
+        masks = all_masks[popcounts == size]
+        for start in range(0, len(masks), chunk_size):
+            chunk = masks[start : start + chunk_size]
+            _, values = _reroll(_final_values(chunk, future))
+            _, values = _reroll(values)
+            future[chunk] = values @ TRANSITIONS[EMPTY_KEEP]
+    return future
+
+
+# ----------------------------------------------------------------------
+# Table persistée (fichier binaire partagé par mmap entre les workers)
+# ----------------------------------------------------------------------
+
+# En-tête de 64 octets : magic, empreinte des règles (sha256), nombre de masques
+TABLE_MAGIC = b"YTZSOLV1"
+_HEADER = struct.Struct("<8s32sI20x")
+
+
+def rules_fingerprint() -> bytes:
+    """
+    Empreinte des règles de score : une table construite avec d'autres règles est refusée au chargement.
+    """
+    digest = hashlib.sha256()
+    digest.update(",".join(CATEGORIES).encode())
+    digest.update(bytes(SCORE_TABLE))
+    return digest.digest()
+
+
+def save_future_values(path: str, future: np.ndarray) -> None:
+    """
+    Écrit la table dans un fichier binaire (écriture atomique par renommage).
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(TABLE_MAGIC, rules_fingerprint(), len(future)))
+        f.write(np.ascontiguousarray(future, dtype="<f8").tobytes())
+    os.replace(tmp_path, path)
+
+
+def load_future_values(path: str) -> np.ndarray:
+    """
+    Projette la table en mémoire (lecture seule, sans copie) après vérification de l'en-tête.
+    """
+    with open(path, "rb") as f:
+        magic, fingerprint, count = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != TABLE_MAGIC or count != FULL_MASK + 1:
+        raise ValueError(f"Invalid strategy table file: {path}")
+    if fingerprint != rules_fingerprint():
+        raise ValueError(f"Strategy table {path} was built for different scoring rules")
+    return np.memmap(path, dtype="<f8", mode="r", offset=_HEADER.size, shape=(count,))
+
+
+# ----------------------------------------------------------------------
+# Solveur
+# ----------------------------------------------------------------------
+
+
+class Solver:
+    future: np.ndarray
+
+    def __init__(self, future: np.ndarray, cache_size: int = 1024):
+        """
+        :param future: Espérance restante en début de tour, indexée par masque (voir `build_future_values`)
+        :param cache_size: Nombre de masques dont les tables de tour sont gardées en mémoire
+        """
+        self.future = future
+        self._turn_tables = lru_cache(maxsize=cache_size)(self._compute_turn_tables)
+
+    @classmethod
+    def build(cls) -> "Solver":
+        return cls(build_future_values())
+
+    def _compute_turn_tables(self, mask: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Espérance de chaque ensemble gardé avec 1 puis 2 relances restantes, pour un masque donné.
+        """
+        masks = np.array([mask])
+        last_keep, values = _reroll(_final_values(masks, self.future))
+        first_keep, _ = _reroll(values)
+        return last_keep[0], first_keep[0]
+
+    def best_category(self, mask: int, dice: list[int]) -> tuple[str, float]:
+        """
+        Catégorie maximisant score immédiat + espérance restante.
+        """
+        row = MULTISET_INDEX.get(tuple(sorted(dice)))
+        if row is None:
+            raise ValueError("Dice must be rolled before choosing a category")
+        best, best_value = -1, -np.inf
+        for idx in range(N_CATEGORIES):
+            if mask & (1 << idx):
+                value = SCORE_TABLE[row * N_CATEGORIES + idx] + self.future[mask & ~(1 << idx)]
+                if value > best_value:
+                    best, best_value = idx, value
+        return CATEGORIES[best], float(best_value)
+
+    def best_action(self, state: RuntimeGameState) -> Hint:
+        """
+        Retourne l'action maximisant l'espérance du score final depuis un état de partie.
+        """
+        mask = open_mask(state.scores)
+        if mask == 0:
+            raise ValueError("Game is finished")
+
+        # Début de tour : les dés doivent être lancés
+        if state.rolls_left >= 3:
+            return Hint(
+                action="roll",
+                locked_dice=[],
+                expected_score=state.total_score + float(self.future[mask]),
+            )
+
+        if state.rolls_left <= 0:
+            category, value = self.best_category(mask, state.dice_values)
+            return Hint(action="score", category=category, expected_score=state.total_score + value)
+
+        row = MULTISET_INDEX.get(tuple(sorted(state.dice_values)))
+        if row is None:
+            raise ValueError("Dice must be rolled before choosing a category")
+        expected = self._turn_tables(mask)[state.rolls_left - 1]
+        candidates = SUB_KEEPS[row]
+        keep_idx = int(candidates[expected[candidates].argmax()])
+        keep = KEEPS[keep_idx]
+
+        # Garder les 5 dés revient à marquer immédiatement
+        if len(keep) == 5:
+            category, value = self.best_category(mask, state.dice_values)
+            return Hint(action="score", category=category, expected_score=state.total_score + value)
+
+        return Hint(
+            action="roll",
+            locked_dice=_keep_positions(state.dice_values, keep),
+            expected_score=state.total_score + float(expected[keep_idx]),
+        )
+
+
+def _keep_positions(dice: list[int], keep: tuple[int, ...]) -> list[int]:
+    """
+    Traduit un multiset de valeurs à garder en index de dés à verrouiller.
+    """
+    remaining = list(keep)
+    positions = []
+    for idx, value in enumerate(dice):
+        if value in remaining:
+            remaining.remove(value)
+            positions.append(idx)
+    return positions
+
+
+_solver: Optional[Solver] = None
+_solver_lock = threading.Lock()
+
+
+def get_solver() -> Solver:
+    """
+    Retourne le solveur partagé du processus, chargé depuis la table persistée
+    si elle existe et correspond aux règles, sinon construit au premier appel.
+    """
+    global _solver
+    if _solver is None:
+        with _solver_lock:
+            if _solver is None:
+                _solver = _load_or_build()
+    return _solver
+
+
+def _load_or_build() -> Solver:
+    path = settings.strategy_table_path
+    if path and Path(path).exists():
+        try:
+            return Solver(load_future_values(path))
+        except ValueError as e:
+            logger.warning("%s, rebuilding in process", e)
+    return Solver.build()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit la table de stratégie optimale du solveur")
+    parser.add_argument("--output", default=settings.strategy_table_path, help="Chemin du fichier généré")
+    args = parser.parse_args()
+    save_future_values(args.output, build_future_values())
+    print(f"Strategy table written to {args.output}")
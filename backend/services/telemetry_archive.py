@@ -0,0 +1,212 @@
+"""
+Fichier d'archivage en colonnes de la télémétrie ancienne : compaction hors de la base et lecture par memmap
+"""
+
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+import argparse
+import shutil
+import struct
+import time
+
+import numpy as np
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal
+from db.models import TelemetrySample
+
+DAY = 86400
+# Identifiants par requête de suppression (limite de paramètres des anciennes versions de SQLite)
+DELETE_CHUNK = 900
+
+# ----------------------------------------------------------------------
+# Format des fichiers
+# ----------------------------------------------------------------------
+# Un fichier par utilisateur, métrique et jour UTC : `<racine>/<user_id>/<metric>/<AAAA-MM-JJ>.tlm`
+#   en-tête (32 octets) : magique, nombre d'échantillons, horodatage du premier échantillon en unités,
+#                         unité en microsecondes (1 ou 1000)
+#   deltas   : uint32[count], écart en unités avec l'échantillon précédent (0 pour le premier)
+#   valeurs  : float32[count]
+# L'unité est la microseconde, ou la milliseconde si le jour couvre plus de 2^32 µs (environ 71 minutes).
+
+ARCHIVE_MAGIC = b"YTZTLM01"
+_HEADER = struct.Struct("<8sIqI8x")
+_UNITS_US = (1, 1000)
+
+
+def day_path(root: Path, user_id: int, metric: str, day: int) -> Path:
+    """
+    :param day: Jour UTC en nombre de jours depuis l'epoch
+    """
+    date = datetime.fromtimestamp(day * DAY, tz=timezone.utc).date()
+    return root / str(user_id) / metric / f"{date.isoformat()}.tlm"
+
+
+def write_day(path: Path, timestamps: np.ndarray, values: np.ndarray) -> None:
+    """
+    Écrit les échantillons d'un jour, triés et dédoublonnés à la précision du format ;
+    écriture atomique par renommage.
+    """
+    for unit_us in _UNITS_US:
+        ticks = np.round(timestamps * (1_000_000 / unit_us)).astype(np.int64)
+        if ticks.max() - ticks.min() < 2**32:
+            break
+    else:
+        raise ValueError("Samples of one day cannot be more than 49 days apart")
+    _, unique = np.unique(np.rec.fromarrays([ticks, values.astype(np.float32)]), return_index=True)
+    ticks, values = ticks[unique], values[unique]
+    deltas = np.diff(ticks, prepend=ticks[0])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(ARCHIVE_MAGIC, len(ticks), int(ticks[0]), unit_us))
+        f.write(deltas.astype("<u4").tobytes())
+        f.write(np.ascontiguousarray(values, dtype="<f4").tobytes())
+    tmp_path.replace(path)
+
+
+def read_day(path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Lit un fichier de jour : horodatages reconstitués (float64, secondes) et valeurs projetées
+    en mémoire sans copie (float32, lecture seule).
+    """
+    with open(path, "rb") as f:
+        magic, count, first, unit_us = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != ARCHIVE_MAGIC or unit_us not in _UNITS_US:
+        raise ValueError(f"Invalid telemetry archive file: {path}")
+    if count == 0:
+        return np.empty(0), np.empty(0, dtype=np.float32)
+    deltas = np.memmap(path, dtype="<u4", mode="r", offset=_HEADER.size, shape=(count,))
+    values = np.memmap(path, dtype="<f4", mode="r", offset=_HEADER.size + 4 * count, shape=(count,))
+    timestamps = (first + np.cumsum(deltas, dtype=np.int64)) * (unit_us / 1_000_000)
+    return timestamps, values
+
+
+# ----------------------------------------------------------------------
+# Lecture
+# ----------------------------------------------------------------------
+
+
+def read_cold(root: Path, user_id: int, metric: str, start: float, end: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Échantillons archivés d'une métrique sur `[start, end)`, triés par horodatage.
+    """
+    parts_t, parts_v = [], []
+    for day in range(int(start // DAY), int(np.ceil(end / DAY))):
+        path = day_path(root, user_id, metric, day)
+        if not path.exists():
+            continue
+        timestamps, values = read_day(path)
+        lo, hi = np.searchsorted(timestamps, [start, end])
+        parts_t.append(timestamps[lo:hi])
+        parts_v.append(values[lo:hi])
+    if not parts_t:
+        return np.empty(0), np.empty(0)
+    return np.concatenate(parts_t), np.concatenate(parts_v).astype(np.float64)
+
+
+def read_samples(
+    db: Session, user_id: int, metric: str, start: float, end: float, root: Optional[Path] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Échantillons d'une métrique sur `[start, end)` : fichiers archivés complétés par les lignes de la base.
+
+    :return: `(horodatages, valeurs)` triés par horodatage
+    """
+    cold_t, cold_v = read_cold(root or Path(settings.telemetry_archive_path), user_id, metric, start, end)
+    rows = db.execute(
+        select(TelemetrySample.timestamp, TelemetrySample.value)
+        .where(
+            TelemetrySample.user_id == user_id,
+            TelemetrySample.metric == metric,
+            TelemetrySample.timestamp >= start,
+            TelemetrySample.timestamp < end,
+        )
+        .order_by(TelemetrySample.timestamp)
+    ).all()
+    if not rows:
+        return cold_t, cold_v
+    hot_t, hot_v = (np.array(column, dtype=np.float64) for column in zip(*rows))
+    if not len(cold_t):
+        return hot_t, hot_v
+    timestamps, values = np.concatenate([cold_t, hot_t]), np.concatenate([cold_v, hot_v])
+    order = np.argsort(timestamps, kind="stable")
+    return timestamps[order], values[order]
+
+
+# ----------------------------------------------------------------------
+# Compaction
+# ----------------------------------------------------------------------
+
+
+def compact(db: Session, before: float, root: Optional[Path] = None) -> int:
+    """
+    Déplace dans les fichiers d'archive les échantillons des jours complets antérieurs à `before`,
+    un fichier (et une transaction) par utilisateur, métrique et jour. Un fichier existant est fusionné,
+    sans doublon : une compaction interrompue entre l'écriture du fichier et la suppression des lignes
+    peut être relancée.
+
+    :return: Nombre d'échantillons archivés
+    """
+    root = root or Path(settings.telemetry_archive_path)
+    cutoff = int(before // DAY) * DAY
+    series = db.execute(
+        select(TelemetrySample.user_id, TelemetrySample.metric, func.min(TelemetrySample.timestamp))
+        .where(TelemetrySample.timestamp < cutoff)
+        .group_by(TelemetrySample.user_id, TelemetrySample.metric)
+    ).all()
+
+    archived = 0
+    for user_id, metric, first in series:
+        for day in range(int(first // DAY), cutoff // DAY):
+            in_day = (
+                TelemetrySample.user_id == user_id,
+                TelemetrySample.metric == metric,
+                TelemetrySample.timestamp >= day * DAY,
+                TelemetrySample.timestamp < (day + 1) * DAY,
+            )
+            rows = db.execute(
+                select(TelemetrySample.id, TelemetrySample.timestamp, TelemetrySample.value).where(*in_day)
+            ).all()
+            if not rows:
+                continue
+            ids, timestamps, values = zip(*rows)
+            timestamps, values = np.array(timestamps, dtype=np.float64), np.array(values, dtype=np.float64)
+            path = day_path(root, user_id, metric, day)
+            if path.exists():
+                old_t, old_v = read_day(path)
+                timestamps = np.concatenate([old_t, timestamps])
+                values = np.concatenate([old_v, values])
+            write_day(path, timestamps, values)
+            # Seules les lignes lues sont supprimées : un lot écrit entre-temps dans ce jour reste en base
+            for offset in range(0, len(ids), DELETE_CHUNK):
+                db.execute(delete(TelemetrySample).where(TelemetrySample.id.in_(ids[offset : offset + DELETE_CHUNK])))
+            db.commit()
+            archived += len(rows)
+    return archived
+
+
+def purge_user(user_id: int, root: Optional[Path] = None) -> None:
+    """
+    Supprime les fichiers d'archive d'un utilisateur (suppression de l'utilisateur).
+    """
+    shutil.rmtree(Path(root or settings.telemetry_archive_path) / str(user_id), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive en fichiers colonnes la télémétrie ancienne")
+    parser.add_argument(
+        "--hot-days", type=int, default=settings.telemetry_hot_days, help="Nombre de jours gardés en base"
+    )
+    parser.add_argument("--output", default=settings.telemetry_archive_path, help="Dossier des archives")
+    args = parser.parse_args()
+    session = SessionLocal()
+    try:
+        count = compact(session, time.time() - args.hot_days * DAY, Path(args.output))
+    finally:
+        session.close()
+    print(f"{count} telemetry samples archived to {args.output}")
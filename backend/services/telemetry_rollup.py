@@ -0,0 +1,233 @@
+"""
+Fichier de calcul des agrégats de télémétrie par paliers (1 s, 1 min, 1 h) et des requêtes par intervalle
+"""
+
+from typing import NamedTuple, Optional, Sequence
+import math
+
+import numpy as np
+from sqlalchemy import case, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from db.models import TelemetryRollup
+from services import telemetry_archive
+
+# Largeurs des paliers d'agrégats, en secondes
+ROLLUP_TIERS: tuple[int, ...] = (1, 60, 3600)
+# Nombre maximal de points retournés par une requête
+MAX_POINTS = 10000
+# Nombre de points visé lorsque la résolution n'est pas demandée
+DEFAULT_POINTS = 500
+# Nombre maximal d'agrégats d'un palier lus par une requête
+MAX_TIER_ROWS = 1_000_000
+
+
+class Buckets(NamedTuple):
+    """
+    Agrégats en colonnes, un élément par intervalle (`bucket` = début de l'intervalle en secondes).
+    """
+
+    bucket: np.ndarray
+    count: np.ndarray
+    min: np.ndarray
+    max: np.ndarray
+    sum: np.ndarray
+    last: np.ndarray
+    last_timestamp: np.ndarray
+
+
+def _group_ends(*keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Début et fin (exclue) de chaque groupe de lignes consécutives de mêmes clés (lignes déjà triées).
+    """
+    size = len(keys[0])
+    changed = np.zeros(size, dtype=bool)
+    changed[0] = True
+    for key in keys:
+        changed[1:] |= key[1:] != key[:-1]
+    starts = np.flatnonzero(changed)
+    return starts, np.append(starts[1:], size)
+
+
+def _columns(rows: list, dtypes: Sequence) -> tuple[np.ndarray, ...]:
+    """
+    Convertit des lignes de résultat en colonnes NumPy.
+    """
+    if not rows:
+        return tuple(np.empty(0, dtype=dtype) for dtype in dtypes)
+    return tuple(np.array(column, dtype=dtype) for column, dtype in zip(zip(*rows), dtypes))
+
+
+def _reduce(
+    starts: np.ndarray, ends: np.ndarray, bucket: np.ndarray, count, min, max, sum, last, last_timestamp
+) -> Buckets:
+    """
+    Combine des agrégats (ou des échantillons, avec `count` = 1) triés par groupe puis par horodatage.
+    """
+    return Buckets(
+        bucket[starts],
+        np.add.reduceat(count, starts),
+        np.minimum.reduceat(min, starts),
+        np.maximum.reduceat(max, starts),
+        np.add.reduceat(sum, starts),
+        last[ends - 1],
+        last_timestamp[ends - 1],
+    )
+
+
+def compute_rollups(
+    user_ids: np.ndarray, metrics: np.ndarray, timestamps: np.ndarray, values: np.ndarray, resolution: int
+) -> tuple[np.ndarray, np.ndarray, Buckets]:
+    """
+    Agrège un lot d'échantillons par `(utilisateur, métrique, intervalle de resolution secondes)`.
+
+    :return: `(user_ids, metrics, agrégats)` d'un élément par groupe
+    """
+    bucket = (np.floor(timestamps / resolution) * resolution).astype(np.int64)
+    order = np.lexsort((timestamps, bucket, metrics, user_ids))
+    user_ids, metrics, bucket = user_ids[order], metrics[order], bucket[order]
+    timestamps, values = timestamps[order], values[order]
+    starts, ends = _group_ends(user_ids, metrics, bucket)
+    ones = np.ones(len(values), dtype=np.int64)
+    buckets = _reduce(starts, ends, bucket, ones, values, values, values, values, timestamps)
+    return user_ids[starts], metrics[starts], buckets
+
+
+def upsert_rollups(
+    db: Session,
+    user_ids: np.ndarray,
+    metrics: np.ndarray,
+    timestamps: np.ndarray,
+    values: np.ndarray,
+    metric_names: Sequence[str],
+) -> None:
+    """
+    Fusionne les agrégats d'un lot d'échantillons dans `telemetry_rollups` pour chaque palier,
+    en une requête groupée (INSERT ... ON CONFLICT DO UPDATE) par palier, sans commit.
+
+    :param metrics: Codes des métriques, index dans `metric_names`
+    """
+    if not len(user_ids):
+        return
+    insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    table = TelemetryRollup
+    for resolution in ROLLUP_TIERS:
+        group_users, group_metrics, buckets = compute_rollups(user_ids, metrics, timestamps, values, resolution)
+        rows = [
+            {
+                "user_id": user_id,
+                "metric": metric_names[code],
+                "resolution": resolution,
+                "bucket": bucket,
+                "count": count,
+                "min": min_,
+                "max": max_,
+                "sum": sum_,
+                "last": last,
+                "last_timestamp": last_timestamp,
+            }
+            for user_id, code, bucket, count, min_, max_, sum_, last, last_timestamp in zip(
+                group_users.tolist(), group_metrics.tolist(), *(column.tolist() for column in buckets)
+            )
+        ]
+        statement = insert(table)
+        new = statement.excluded
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.user_id, table.metric, table.resolution, table.bucket],
+            set_={
+                "count": table.count + new.count,
+                "min": case((new.min < table.min, new.min), else_=table.min),
+                "max": case((new.max > table.max, new.max), else_=table.max),
+                "sum": table.sum + new.sum,
+                "last": case((new.last_timestamp >= table.last_timestamp, new.last), else_=table.last),
+                "last_timestamp": case(
+                    (new.last_timestamp >= table.last_timestamp, new.last_timestamp), else_=table.last_timestamp
+                ),
+            },
+        )
+        db.execute(statement, rows)
+
+
+def choose_tier(resolution: float) -> Optional[int]:
+    """
+    Palier le plus grossier dont la largeur divise la résolution demandée, ou `None` si aucun ne la divise :
+    résolution inférieure au plus petit palier (échantillons bruts) ou non entière (refusée par `query_range`).
+    """
+    tiers = [tier for tier in ROLLUP_TIERS if tier <= resolution and resolution % tier == 0]
+    return tiers[-1] if tiers else None
+
+
+def default_resolution(start: float, end: float) -> float:
+    """
+    Résolution d'une requête qui n'en précise pas : `[start, end)` découpé en `DEFAULT_POINTS` points au plus,
+    arrondie au multiple supérieur du plus grand palier qu'elle atteint pour être servie par ce palier.
+    Sous le plus petit palier, la résolution n'est pas arrondie et la requête lit les échantillons bruts.
+    """
+    resolution = (end - start) / DEFAULT_POINTS
+    tiers = [tier for tier in ROLLUP_TIERS if tier <= resolution]
+    if not tiers:
+        return resolution
+    return math.ceil(resolution / tiers[-1]) * tiers[-1]
+
+
+def query_range(
+    db: Session, user_id: int, metric: str, start: float, end: float, resolution: float
+) -> tuple[Optional[int], Buckets]:
+    """
+    Agrégats d'une métrique par intervalles de `resolution` secondes alignés sur l'epoch, pour tous les
+    intervalles qui recoupent `[start, end)` (les intervalles des bords sont complets).
+    Les intervalles sont calculés depuis le palier le plus grossier qui divise la résolution, ou depuis les
+    échantillons bruts pour une résolution plus fine que le plus petit palier (base et fichiers d'archive) :
+    une résolution plus large doit être un multiple d'un palier, pour ne jamais lire les échantillons bruts
+    d'un long intervalle.
+
+    :return: `(palier utilisé ou None, agrégats)`
+    :raises ValueError: Si l'intervalle est vide, demande trop de points ou d'agrégats,
+        ou si la résolution n'est multiple d'aucun palier
+    """
+    if end <= start or resolution <= 0:
+        raise ValueError("Expected start < end and a positive resolution")
+    if (end - start) / resolution > MAX_POINTS:
+        raise ValueError(f"At most {MAX_POINTS} points per query, increase the resolution")
+    tier = choose_tier(resolution)
+    if tier is None and resolution >= ROLLUP_TIERS[0]:
+        raise ValueError(f"Resolution must be below {ROLLUP_TIERS[0]}s or a multiple of {ROLLUP_TIERS[0]}s")
+    if tier is not None and (end - start) / tier > MAX_TIER_ROWS:
+        coarser = [width for width in ROLLUP_TIERS if width > tier]
+        hint = f", use a multiple of {coarser[0]}s" if coarser else ""
+        raise ValueError(f"Range too long for a {tier}s rollup tier{hint}")
+
+    start = math.floor(start / resolution) * resolution
+    end = math.ceil(end / resolution) * resolution
+    if tier is None:
+        timestamps, values = telemetry_archive.read_samples(db, user_id, metric, start, end)
+        count = np.ones(len(values), dtype=np.int64)
+        columns = (timestamps, count, values, values, values, values, timestamps)
+    else:
+        rows = db.execute(
+            select(
+                TelemetryRollup.bucket,
+                TelemetryRollup.count,
+                TelemetryRollup.min,
+                TelemetryRollup.max,
+                TelemetryRollup.sum,
+                TelemetryRollup.last,
+                TelemetryRollup.last_timestamp,
+            )
+            .where(
+                TelemetryRollup.user_id == user_id,
+                TelemetryRollup.metric == metric,
+                TelemetryRollup.resolution == tier,
+                TelemetryRollup.bucket >= start,
+                TelemetryRollup.bucket < end,
+            )
+            .order_by(TelemetryRollup.bucket)
+        ).all()
+        columns = _columns(rows, (np.float64, np.int64) + (np.float64,) * 5)
+
+    if not len(columns[0]):
+        return tier, Buckets(*(np.empty(0) for _ in Buckets._fields))
+    bucket = np.floor(columns[0] / resolution) * resolution
+    starts, ends = _group_ends(bucket)
+    return tier, _reduce(starts, ends, bucket, *columns[1:])
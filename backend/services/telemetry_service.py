@@ -0,0 +1,314 @@
+"""
+Fichier de gestion de l'ingestion de la télémétrie : validation, tampon circulaire et écriture par lots
+"""
+
+from typing import Callable, NamedTuple, Optional, Sequence
+import logging
+import threading
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from db.database import SessionLocal
+from db.models import TelemetrySample, User
+from db.schemas import TelemetrySampleIn
+from services import telemetry_rollup
+from services.user_service import ALLOWED_METRICS
+
+logger = logging.getLogger(__name__)
+
+# Codes des métriques dans le tampon (en mémoire uniquement : la table stocke le nom)
+METRICS: tuple[str, ...] = tuple(sorted(ALLOWED_METRICS))
+METRIC_CODES: dict[str, int] = {metric: code for code, metric in enumerate(METRICS)}
+
+
+class SampleBatch(NamedTuple):
+    """
+    Lot d'échantillons en colonnes.
+    """
+
+    user_ids: np.ndarray  # int64
+    metrics: np.ndarray  # uint8, index dans `METRICS`
+    timestamps: np.ndarray  # float64, secondes depuis l'epoch
+    values: np.ndarray  # float64
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+
+class SampleBuffer:
+    """
+    Tampon circulaire d'échantillons en colonnes NumPy préallouées.
+
+    Les échantillons ne sont retirés qu'après leur écriture (`peek` puis `consume`) : un échec
+    d'écriture ne perd rien. Un lot qui ne tient pas dans la place libre est refusé en entier.
+    """
+
+    def __init__(self, capacity: int):
+        """
+        :param capacity: Nombre maximal d'échantillons en attente
+        """
+        self.capacity = capacity
+        self._columns = SampleBatch(
+            np.empty(capacity, dtype=np.int64),
+            np.empty(capacity, dtype=np.uint8),
+            np.empty(capacity, dtype=np.float64),
+            np.empty(capacity, dtype=np.float64),
+        )
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, batch: SampleBatch) -> None:
+        """
+        :raises BufferError: Si le tampon n'a pas la place pour tout le lot
+        """
+        count = len(batch)
+        with self._lock:
+            if self._size + count > self.capacity:
+                raise BufferError("Telemetry buffer is full")
+            end = (self._start + self._size) % self.capacity
+            first = min(count, self.capacity - end)
+            for column, values in zip(self._columns, batch):
+                column[end : end + first] = values[:first]
+                column[: count - first] = values[first:]
+            self._size += count
+
+    def peek(self, limit: int) -> SampleBatch:
+        """
+        Copie des `limit` plus anciens échantillons, sans les retirer.
+        """
+        with self._lock:
+            count = min(limit, self._size)
+            positions = (self._start + np.arange(count)) % self.capacity
+            return SampleBatch(*(column[positions] for column in self._columns))
+
+    def consume(self, count: int) -> None:
+        """
+        Retire les `count` plus anciens échantillons (après leur écriture).
+        """
+        with self._lock:
+            count = min(count, self._size)
+            self._start = (self._start + count) % self.capacity
+            self._size -= count
+
+
+def make_batch(
+    user_ids: Sequence[int], metrics: Sequence[str], timestamps: Sequence[float], values: Sequence[float]
+) -> SampleBatch:
+    """
+    Valide des échantillons et les convertit en colonnes.
+
+    :raises ValueError: Si une métrique n'est pas dans `ALLOWED_METRICS`, un lot est trop grand
+        ou une valeur n'est pas finie
+    """
+    if len(user_ids) > settings.telemetry_max_batch:
+        raise ValueError(f"At most {settings.telemetry_max_batch} samples per batch")
+    try:
+        codes = np.fromiter((METRIC_CODES[metric] for metric in metrics), dtype=np.uint8, count=len(metrics))
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Unknown metric, expected one of {list(METRICS)}") from e
+    batch = SampleBatch(
+        np.asarray(user_ids, dtype=np.int64),
+        codes,
+        np.asarray(timestamps, dtype=np.float64),
+        np.asarray(values, dtype=np.float64),
+    )
+    if not (np.isfinite(batch.timestamps).all() and np.isfinite(batch.values).all()):
+        raise ValueError("Timestamps and values must be finite numbers")
+    return batch
+
+
+def existing_user_ids(db: Session, user_ids: Sequence[int]) -> set[int]:
+    return set(db.scalars(select(User.id).where(User.id.in_(set(user_ids)))))
+
+
+class TelemetryIngestor:
+    """
+    Point d'entrée de la télémétrie : les échantillons validés vont dans le tampon, vidé
+    par un thread de fond en insertions groupées dans `telemetry_samples` et `telemetry_rollups`.
+    """
+
+    def __init__(
+        self, session_factory: Callable[[], Session], capacity: int, flush_interval: float, flush_batch: int
+    ):
+        """
+        :param session_factory: Constructeur de sessions utilisé pour les écritures
+        :param capacity: Taille du tampon en échantillons
+        :param flush_interval: Intervalle en secondes entre deux écritures du thread de fond
+        :param flush_batch: Nombre maximal d'échantillons par transaction
+        """
+        self.session_factory = session_factory
+        self.buffer = SampleBuffer(capacity)
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ----------------------------------------------------------------------
+    # Ingestion
+    # ----------------------------------------------------------------------
+
+    def ingest(self, db: Session, samples: list[TelemetrySampleIn]) -> int:
+        """
+        Ajoute un lot d'échantillons de plusieurs utilisateurs (route HTTP).
+
+        :raises ValueError: Si un échantillon est invalide ou un utilisateur inconnu
+        :raises BufferError: Si le tampon est plein
+        """
+        batch = make_batch(
+            [sample.user_id for sample in samples],
+            [sample.metric for sample in samples],
+            [sample.timestamp for sample in samples],
+            [sample.value for sample in samples],
+        )
+        unknown = set(batch.user_ids.tolist()) - existing_user_ids(db, batch.user_ids.tolist())
+        if unknown:
+            raise ValueError(f"Unknown users: {sorted(unknown)}")
+        self.buffer.append(batch)
+        return len(batch)
+
+    def ingest_rows(self, user_id: int, rows: list) -> int:
+        """
+        Ajoute des échantillons `[metric, timestamp, value]` d'un utilisateur déjà vérifié (WebSocket).
+
+        :raises ValueError: Si un échantillon est invalide
+        :raises BufferError: Si le tampon est plein
+        """
+        if not isinstance(rows, list) or not all(isinstance(row, list) and len(row) == 3 for row in rows):
+            raise ValueError("Samples must be [metric, timestamp, value] lists")
+        metrics, timestamps, values = zip(*rows) if rows else ((), (), ())
+        if not all(isinstance(x, (int, float)) for x in timestamps + values):
+            raise ValueError("Timestamps and values must be numbers")
+        batch = make_batch([user_id] * len(metrics), metrics, timestamps, values)
+        self.buffer.append(batch)
+        return len(batch)
+
+    # ----------------------------------------------------------------------
+    # Écriture
+    # ----------------------------------------------------------------------
+
+    def _insert(self, db: Session, batch: SampleBatch) -> None:
+        rows = [
+            {"user_id": user_id, "metric": METRICS[code], "timestamp": timestamp, "value": value}
+            for user_id, code, timestamp, value in zip(*(column.tolist() for column in batch))
+        ]
+        db.execute(insert(TelemetrySample), rows)
+        telemetry_rollup.upsert_rollups(db, *batch, METRICS)
+        db.commit()
+
+    def flush(self) -> int:
+        """
+        Écrit tous les échantillons en attente, par transactions d'au plus `flush_batch` lignes.
+        Les échantillons d'utilisateurs supprimés entre-temps sont écartés.
+
+        :return: Nombre d'échantillons écrits
+        """
+        written = 0
+        with self._flush_lock:
+            db = self.session_factory()
+            try:
+                while len(self.buffer):
+                    batch = self.buffer.peek(self.flush_batch)
+                    count = len(batch)
+                    try:
+                        self._insert(db, batch)
+                    except IntegrityError:
+                        db.rollback()
+                        known = np.isin(batch.user_ids, list(existing_user_ids(db, batch.user_ids.tolist())))
+                        logger.warning("Dropping %d telemetry samples of deleted users", int((~known).sum()))
+                        batch = SampleBatch(*(column[known] for column in batch))
+                        if len(batch):
+                            self._insert(db, batch)
+                    self.buffer.consume(count)
+                    written += len(batch)
+            except Exception:
+                db.rollback()
+                raise
+            finally:
+                db.close()
+        return written
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Telemetry flush failed")
+
+    def start(self) -> None:
+        """
+        Démarre le thread d'écriture périodique.
+        """
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="telemetry-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Arrête le thread d'écriture et vide le tampon.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+def query_series(
+    db: Session, user_id: int, metric: str, start: float, end: float, resolution: Optional[float] = None
+) -> dict:
+    """
+    Série d'agrégats (min, max, moyenne, dernière valeur) d'une métrique sur `[start, end)`.
+
+    :param resolution: Largeur des intervalles en secondes (par défaut, `telemetry_rollup.default_resolution`)
+    :raises ValueError: Si la métrique est inconnue ou la requête invalide
+    """
+    if metric not in METRIC_CODES:
+        raise ValueError(f"Unknown metric, expected one of {list(METRICS)}")
+    if resolution is None:
+        resolution = telemetry_rollup.default_resolution(start, end)
+    tier, buckets = telemetry_rollup.query_range(db, user_id, metric, start, end, resolution)
+    points = [
+        {"timestamp": bucket, "count": count, "min": min_, "max": max_, "mean": sum_ / count, "last": last}
+        for bucket, count, min_, max_, sum_, last in zip(
+            buckets.bucket.tolist(),
+            buckets.count.tolist(),
+            buckets.min.tolist(),
+            buckets.max.tolist(),
+            buckets.sum.tolist(),
+            buckets.last.tolist(),
+        )
+    ]
+    return {"user_id": user_id, "metric": metric, "resolution": resolution, "tier": tier, "points": points}
+
+
+telemetry = TelemetryIngestor(
+    SessionLocal, settings.telemetry_buffer_size, settings.telemetry_flush_interval, settings.telemetry_flush_batch
+)
+
+
+# ----------------------------------------------------------------------
+# Versions asynchrones (exécutées sur la connexion asynchrone via `run_sync`)
+# ----------------------------------------------------------------------
+
+
+async def ingest_async(db: AsyncSession, samples: list[TelemetrySampleIn]) -> int:
+    return await db.run_sync(telemetry.ingest, samples)
+
+
+async def existing_user_ids_async(db: AsyncSession, user_ids: Sequence[int]) -> set[int]:
+    return await db.run_sync(existing_user_ids, user_ids)
+
+
+async def query_series_async(db: AsyncSession, *args, **kwargs) -> dict:
+    return await db.run_sync(query_series, *args, **kwargs)
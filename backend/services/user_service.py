@@ -3,21 +3,37 @@ Fichier de gestion de la logique métier du service Telemetry
 """
 
 from typing import Optional
+from sqlalchemy import delete, insert, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from db.models import User
 from db.schemas import UserCreate
+from services.game_cache import game_cache
+from services.leaderboard_service import leaderboard
+from services.move_journal import move_journal
+from services.telemetry_archive import purge_user
+from utils.utils import decode_cursor
 
 ALLOWED_METRICS = {"temperature", "altitude", "speed"}
 
 
-def list_users(db: Session) -> list[User]:
+def list_users(db: Session, limit: Optional[int] = None, cursor: Optional[str] = None) -> list[User]:
     """
-    Récupère tous les utilisateurs de la base de données
+    Récupère les utilisateurs de la base de données, des plus récents aux plus anciens,
+    par pagination sur `(created_at, id)`
 
     :param db: Session de la base de données
+    :param limit: Taille de la page, ou `None` pour tout récupérer
+    :param cursor: Curseur de la page précédente (voir `utils.encode_cursor`)
     """
-    return db.query(User).order_by(User.created_at.desc()).all()
+    query = db.query(User)
+    if cursor is not None:
+        query = query.filter(tuple_(User.created_at, User.id) < decode_cursor(cursor))
+    query = query.order_by(User.created_at.desc(), User.id.desc())
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     """
@@ -55,6 +71,90 @@ def delete_user(db: Session, user_id: int) -> Optional[User]:
     db_user = get_user_by_id(db, user_id)
     if db_user is None:
         raise ValueError("Aucun utilisateur trouvé avec cet ID.")
+    # Les coups en attente doivent être écrits avant la suppression en cascade des parties
+    move_journal.flush()
+    # Parties et coups supprimés par la base (`ON DELETE CASCADE`), sans être chargés
     db.delete(db_user)
     db.commit()
+    purge_user(user_id)
+    game_cache.invalidate_user(user_id)
+    leaderboard.users_deleted([user_id])
     return db_user
+
+
+# Nombre maximal d'utilisateurs traités par un appel groupé
+BULK_LIMIT = 10000
+
+
+def create_users(db: Session, users: list[UserCreate]) -> list[User]:
+    """
+    Crée des utilisateurs en une seule insertion groupée (executemany) et une seule transaction
+
+    :param db: Session de la base de données
+    :param users: Schémas Pydantic des utilisateurs à créer
+    :return: Les objets `User` créés, dans l'ordre de `users`
+    """
+    if len(users) > BULK_LIMIT:
+        raise ValueError(f"Au plus {BULK_LIMIT} utilisateurs par appel.")
+    if not users:
+        return []
+    created = db.scalars(
+        insert(User).returning(User, sort_by_parameter_order=True), [user.model_dump() for user in users]
+    ).all()
+    db.commit()
+    return created
+
+
+def delete_users(db: Session, user_ids: list[int]) -> int:
+    """
+    Supprime des utilisateurs en une seule requête DELETE ; leurs parties et coups
+    sont supprimés par la base (`ON DELETE CASCADE`)
+
+    :param db: Session de la base de données
+    :param user_ids: IDs des utilisateurs à supprimer (les IDs inconnus sont ignorés)
+    :return: Le nombre d'utilisateurs supprimés
+    """
+    if len(user_ids) > BULK_LIMIT:
+        raise ValueError(f"Au plus {BULK_LIMIT} utilisateurs par appel.")
+    if not user_ids:
+        return 0
+    move_journal.flush()
+    deleted = db.execute(delete(User).where(User.id.in_(user_ids))).rowcount
+    db.commit()
+    for user_id in user_ids:
+        purge_user(user_id)
+    game_cache.invalidate_users(set(user_ids))
+    leaderboard.users_deleted(list(user_ids))
+    return deleted
+
+
+# ----------------------------------------------------------------------
+# Versions asynchrones (exécutées sur la connexion asynchrone via `run_sync`)
+# ----------------------------------------------------------------------
+
+
+async def list_users_async(db: AsyncSession, limit: Optional[int] = None, cursor: Optional[str] = None) -> list[User]:
+    return await db.run_sync(list_users, limit, cursor)
+
+
+async def get_user_by_id_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await db.run_sync(get_user_by_id, user_id)
+
+
+async def create_user_async(db: AsyncSession, user: UserCreate) -> User:
+    return await db.run_sync(create_user, user)
+
+
+async def delete_user_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    # Coups en attente écrits hors de la boucle d'événements : le `flush` de `delete_user` n'a plus rien à écrire
+    await move_journal.flush_async()
+    return await db.run_sync(delete_user, user_id)
+
+
+async def create_users_async(db: AsyncSession, users: list[UserCreate]) -> list[User]:
+    return await db.run_sync(create_users, users)
+
+
+async def delete_users_async(db: AsyncSession, user_ids: list[int]) -> int:
+    await move_journal.flush_async()
+    return await db.run_sync(delete_users, user_ids)
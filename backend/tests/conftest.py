@@ -0,0 +1,33 @@
+"""
+Configuration commune des tests : base SQLite jetable par test, sans toucher à la base locale
+"""
+
+import os
+
+# Avant tout import de `core.config` : le moteur du module `db.database` ne doit pas ouvrir `yathzee.db`
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db.database import Base, configure_engine
+from services.game_cache import game_cache
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    """
+    Constructeur de sessions sur une base SQLite créée dans un dossier temporaire.
+    """
+    engine = configure_engine(create_engine(f"sqlite:///{tmp_path / 'test.db'}"))
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture(autouse=True)
+def clear_game_cache():
+    game_cache.clear()
+    yield
+    game_cache.clear()
@@ -0,0 +1,78 @@
+"""
+Tests de la diffusion des événements entre workers par le broker "unix"
+"""
+
+import asyncio
+import os
+import socket
+
+from managers.broker import UnixSocketBroker
+
+
+async def _wait_for(received: list, count: int) -> None:
+    for _ in range(100):
+        if len(received) >= count:
+            return
+        await asyncio.sleep(0.01)
+
+
+def _broker(directory, name: str, received: list) -> UnixSocketBroker:
+    broker = UnixSocketBroker(str(directory))
+    # Deux brokers dans le même processus : une socket chacun, au lieu de `<pid>.sock`
+    broker.path = os.path.join(str(directory), f"{name}.sock")
+    broker.subscribe(lambda room, message: received.append((room, message)))
+    return broker
+
+
+def test_malformed_datagram_is_skipped(tmp_path, caplog):
+    async def scenario():
+        received = []
+        broker = _broker(tmp_path, "a", received)
+        await broker.start()
+        sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sender.sendto(b'["trunc', broker.path)
+            sender.sendto(b"\xff\xfe", broker.path)
+            sender.sendto(b"42", broker.path)
+            sender.sendto(b'[7, "ok"]', broker.path)
+            await _wait_for(received, 1)
+        finally:
+            sender.close()
+            await broker.stop()
+        return received
+
+    assert asyncio.run(scenario()) == [(7, "ok")]
+    # Journalisé par le broker, sans exception remontée à la boucle d'événements
+    assert [record.name for record in caplog.records if record.levelname == "ERROR"] == ["managers.broker"] * 3
+
+
+def test_publish_reaches_every_worker(tmp_path):
+    async def scenario():
+        received = {name: [] for name in "abc"}
+        brokers = {name: _broker(tmp_path, name, received[name]) for name in received}
+        for broker in brokers.values():
+            await broker.start()
+        # Socket d'un worker arrêté sans nettoyage : retirée au premier envoi refusé
+        dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        dead.bind(str(tmp_path / "dead.sock"))
+        dead.close()
+        try:
+            brokers["a"].publish("leaderboard", '{"type": "finished"}')
+            brokers["b"].publish(12, "move")
+            for messages in received.values():
+                await _wait_for(messages, 2)
+            await brokers["c"].stop()
+            brokers["a"].publish(13, "after stop")
+            await _wait_for(received["b"], 3)
+        finally:
+            for broker in brokers.values():
+                await broker.stop()
+        return received
+
+    received = asyncio.run(scenario())
+    first = [("leaderboard", '{"type": "finished"}'), (12, "move")]
+    assert sorted(received["c"], key=str) == sorted(first, key=str)
+    for name in "ab":
+        assert sorted(received[name], key=str) == sorted(first + [(13, "after stop")], key=str)
+    assert not (tmp_path / "dead.sock").exists()
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,15 @@
+"""
+Tests de la validation de la configuration
+"""
+
+import pytest
+from pydantic import ValidationError
+
+from core.config import Settings
+
+
+def test_profiler_requires_token():
+    with pytest.raises(ValidationError):
+        Settings(profiler_enabled=True, profiler_token="")
+    assert Settings(profiler_enabled=True, profiler_token="secret").profiler_enabled
+    assert not Settings(profiler_enabled=False, profiler_token="").profiler_enabled
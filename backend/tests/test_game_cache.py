@@ -0,0 +1,157 @@
+"""
+Tests du cache des parties en cours : éviction, expiration, coups concurrents et lecture sans requête
+"""
+
+import asyncio
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from core.config import settings
+from db.database import configure_engine
+from db.models import User
+from services import game_cache as game_cache_module
+from services.dice import FastDiceSource
+from services.game_cache import CachedGame, GameCache, game_cache
+from services.game_service import AsyncGame, Game
+
+
+def _entry(game_id: int, user_id: int = 1) -> CachedGame:
+    return CachedGame(game_id, user_id, None, Game.new_state().to_dict(), 0)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(game_cache_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_least_recently_used_is_evicted():
+    cache = GameCache(max_size=2, ttl=60)
+    cache.put(_entry(1))
+    cache.put(_entry(2))
+    assert cache.get(1) is not None
+    cache.put(_entry(3))
+    assert cache.get(2) is None
+    assert cache.get(1) is not None and cache.get(3) is not None
+
+
+def test_entries_expire(clock):
+    cache = GameCache(max_size=10, ttl=60)
+    cache.put(_entry(1))
+    clock[0] += 59
+    assert cache.peek(1) is not None
+    clock[0] += 2
+    assert cache.peek(1) is None
+    assert cache.get(1) is None
+
+
+def test_replace_refuses_stale_entry():
+    cache = GameCache(max_size=10, ttl=60)
+    loaded = _entry(1)
+    cache.put(loaded)
+    first, second = _entry(1), _entry(1)
+    assert cache.replace(loaded, first)
+    assert not cache.replace(loaded, second)
+    assert cache.get(1) is first
+    # Une entrée sortie du cache (expirée, évincée) ne bloque pas le coup suivant
+    cache.invalidate(1)
+    assert cache.replace(loaded, second)
+
+
+def test_put_if_absent_keeps_newer_entry():
+    cache = GameCache(max_size=10, ttl=60)
+    played = _entry(1)
+    cache.put(played)
+    assert cache.put_if_absent(_entry(1)) is played
+    reloaded = _entry(2)
+    assert cache.put_if_absent(reloaded) is reloaded
+
+
+def test_invalidate_users():
+    cache = GameCache(max_size=10, ttl=60)
+    for game_id, user_id in [(1, 1), (2, 2), (3, 1), (4, 3)]:
+        cache.put(_entry(game_id, user_id))
+    cache.invalidate_users({1, 3})
+    assert [game_id for game_id in range(1, 5) if cache.peek(game_id)] == [2]
+
+
+def test_disabled_cache():
+    cache = GameCache(max_size=0, ttl=60)
+    game = _entry(1)
+    cache.put(game)
+    assert cache.get(1) is None
+    assert cache.put_if_absent(game) is game
+    assert cache.replace(_entry(1), game)
+
+
+# ----------------------------------------------------------------------
+# Parties jouées
+# ----------------------------------------------------------------------
+
+
+@pytest.fixture
+def db(session_factory, monkeypatch):
+    # Écriture immédiate de chaque coup, pour compter les requêtes sans le thread du journal
+    monkeypatch.setattr(settings, "journal_enabled", False)
+    db = session_factory()
+    db.add(User(username="cache", email="cache@test"))
+    db.commit()
+    yield db
+    db.close()
+
+
+def test_cached_game_is_not_selected(db):
+    game_id = Game(db, dice=FastDiceSource(seed=1)).start(user_id=1).id
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda conn, cursor, sql, *args: statements.append(sql))
+
+    game = Game(db, game_id, dice=FastDiceSource(seed=2)).roll()
+
+    assert not [sql for sql in statements if sql.lstrip().upper().startswith("SELECT")]
+    assert [sql.split()[0].upper() for sql in statements] == ["UPDATE"]
+    assert game_cache.get(game_id) is game
+
+
+def test_concurrent_move_is_refused(db):
+    game_id = Game(db, dice=FastDiceSource(seed=1)).start(user_id=1).id
+    first = Game(db, game_id, dice=FastDiceSource(seed=2))
+    second = Game(db, game_id, dice=FastDiceSource(seed=3))
+
+    played = first.roll()
+    with pytest.raises(ValueError, match="concurrent move"):
+        second.roll()
+    # Sans journal, le refus vient de la base : l'entrée est retirée et la partie rechargée avec le coup retenu
+    assert game_cache.get(game_id) is None
+    assert Game(db, game_id).game.state == played.state
+
+
+def test_reload_after_eviction(db):
+    game_id = Game(db, dice=FastDiceSource(seed=1)).start(user_id=1).id
+    played = Game(db, game_id, dice=FastDiceSource(seed=2)).roll()
+    game_cache.clear()
+
+    reloaded = Game(db, game_id)
+    assert reloaded.game is not played
+    assert reloaded.game.state == played.state
+    assert game_cache.get(game_id) is reloaded.game
+
+
+def test_async_game_shares_cache(db, tmp_path):
+    async def play() -> tuple:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+        configure_engine(engine.sync_engine)
+        try:
+            async with async_sessionmaker(bind=engine, expire_on_commit=False)() as session:
+                game = AsyncGame(session, dice=FastDiceSource(seed=1))
+                await game.start(user_id=1)
+                rolled = await game.roll()
+                return rolled, await AsyncGame(session, game.game_id).get()
+        finally:
+            await engine.dispose()
+
+    rolled, fetched = asyncio.run(play())
+    assert fetched is rolled
+    assert Game(db, rolled.id).game is rolled
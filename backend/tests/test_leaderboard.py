@@ -0,0 +1,136 @@
+"""
+Tests du classement en mémoire : rangs et agrégats comparés à un calcul direct, chargement depuis la base
+"""
+
+from datetime import datetime, timedelta
+import random
+import time
+
+import pytest
+
+from core.config import settings
+from db.models import GameSession, User
+from services.game_service import Game
+from services.leaderboard_service import Leaderboard
+
+START = datetime(2026, 1, 1)
+
+
+def _games(count: int, seed: int = 0) -> list[tuple]:
+    """
+    Parties terminées `(game_id, user_id, total_score, yahtzee, finished_at)` tirées au hasard, avec des égalités.
+    """
+    rng = random.Random(seed)
+    return [
+        (game_id, rng.randint(1, 8), rng.randint(0, 60) * 5, rng.random() < 0.2, START + timedelta(minutes=game_id))
+        for game_id in range(1, count + 1)
+    ]
+
+
+def _board(games: list[tuple], top_size: int = 10) -> Leaderboard:
+    board = Leaderboard(session_factory=None, top_size=top_size)
+    for game in games:
+        board.add_game(*game)
+    return board
+
+
+def _check(board: Leaderboard, games: list[tuple]) -> None:
+    """
+    Compare le classement à un calcul direct sur la liste des parties.
+    """
+    scores = [score for _, _, score, _, _ in games]
+    for score in range(-5, 400, 7):
+        assert board.rank_of_score(score) == (sum(s > max(score, 0) for s in scores) + 1, len(games))
+
+    expected_top = sorted(games, key=lambda game: (-game[2], game[0]))[: board.top_size]
+    assert [(g["game_id"], g["total_score"]) for g in board.top_games(board.top_size)] == [
+        (game_id, score) for game_id, _, score, _, _ in expected_top
+    ]
+
+    bests = {}
+    for _, user_id, score, _, _ in games:
+        bests[user_id] = max(bests.get(user_id, 0), score)
+    ranking = sorted(bests, key=lambda user_id: (-bests[user_id], user_id))
+    for user_id, best in bests.items():
+        user_games = [game for game in games if game[1] == user_id]
+        stats = board.user_stats(user_id)
+        assert stats["games"] == len(user_games)
+        assert stats["best_score"] == best
+        assert stats["mean_score"] == pytest.approx(sum(game[2] for game in user_games) / len(user_games))
+        assert stats["yahtzees"] == sum(game[3] for game in user_games)
+        assert stats["rank"] == ranking.index(user_id) + 1
+    assert [stats["user_id"] for stats in board.top_users(3)] == ranking[:3]
+
+
+def test_ranks_match_direct_computation():
+    games = _games(300)
+    board = _board(games)
+    _check(board, games)
+    assert board.user_stats(999) is None
+
+
+def test_scores_are_clamped():
+    board = _board([(1, 1, -10, False, START), (2, 1, 10**6, False, START)])
+    assert board.rank_of_score(10**6) == (1, 2)
+    assert board.rank_of_score(-10) == (2, 2)
+
+
+# ----------------------------------------------------------------------
+# Chargement depuis la base
+# ----------------------------------------------------------------------
+
+
+@pytest.fixture(params=["json", "packed"])
+def finished_games(request, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "state_storage", request.param)
+    games = _games(120, seed=1)
+    db = session_factory()
+    db.add_all(User(id=user_id, username=f"user{user_id}", email=f"user{user_id}@test") for user_id in range(1, 9))
+    db.commit()
+    for game_id, user_id, score, yahtzee, finished_at in games:
+        state = Game.new_state()
+        state.round, state.rolls_left, state.total_score = 13, 0, score
+        # Score réparti sur les catégories, à au plus 40 points chacune (bornes du format compact)
+        remaining = score
+        for category in state.scores:
+            state.scores[category] = min(remaining, 40)
+            remaining -= state.scores[category]
+        state.scores["yahtzee"] = 50 if yahtzee else 0
+        db.add(
+            GameSession(
+                id=game_id,
+                user_id=user_id,
+                state=state.to_dict(),
+                finished=1,
+                total_score=score,
+                finished_at=finished_at,
+            )
+        )
+    # Partie en cours : jamais classée
+    db.add(GameSession(id=1000, user_id=1, state=Game.new_state().to_dict(), finished=0, total_score=400))
+    db.commit()
+    db.close()
+    return games
+
+
+def test_warm_loads_finished_games(session_factory, finished_games):
+    board = Leaderboard(session_factory, top_size=10)
+    board.warm()
+    _check(board, finished_games)
+
+
+def test_removed_users_are_rebuilt(session_factory, finished_games):
+    board = Leaderboard(session_factory, top_size=10)
+    board.warm()
+    db = session_factory()
+    db.query(User).filter(User.id.in_([2, 5])).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+    board.remove_users([2, 5])
+    # Agrégats retirés tout de suite, histogramme et top complétés par la reconstruction en arrière-plan
+    assert board.user_stats(2) is None and board.user_stats(5) is None
+    deadline = time.monotonic() + 10
+    while board._rebuild_thread is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    _check(board, [game for game in finished_games if game[1] not in (2, 5)])
@@ -0,0 +1,30 @@
+"""
+Tests des étiquettes des mesures de requêtes HTTP
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.metrics import MetricsMiddleware
+from utils import metrics
+
+
+def test_request_labels_are_bounded():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        return {"id": item_id}
+
+    client = TestClient(app)
+    client.get("/items/1")
+    client.get("/items/2")
+    client.request("XYZZY", "/items/3")
+    client.request("PURGE-1234", "/nowhere")
+
+    text = metrics.render()
+    assert 'method="GET",route="/items/{item_id}",status="200"' in text
+    assert 'method="OTHER",route="/items/{item_id}",status="405"' in text
+    assert 'method="OTHER",route="unmatched",status="404"' in text
+    assert "XYZZY" not in text and "PURGE-1234" not in text and "/items/1" not in text
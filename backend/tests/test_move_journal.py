@@ -0,0 +1,107 @@
+"""
+Tests du journal des coups : l'état rejoué depuis la base est identique à l'état joué
+"""
+
+import pytest
+
+from core.config import Settings, settings
+from db.models import GameMove, GameSession, User
+from services import game_service
+from services.dice import FastDiceSource
+from services.game_cache import game_cache
+from services.game_service import Game
+from services.move_journal import MoveJournal
+
+
+@pytest.fixture
+def journal(session_factory, monkeypatch):
+    journal = MoveJournal(session_factory, flush_interval=1.0, max_pending=1000)
+    monkeypatch.setattr(game_service, "move_journal", journal)
+    monkeypatch.setattr(settings, "journal_enabled", True)
+    # Instantanés espacés de quelques coups : le rechargement rejoue les coups qui suivent le dernier
+    monkeypatch.setattr(settings, "journal_snapshot_every", 5)
+    return journal
+
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    db.add(User(username="journal", email="journal@test"))
+    db.commit()
+    yield db
+    db.close()
+
+
+def _play_round(game: Game, locked_dice: list[int]) -> bool:
+    game.roll()
+    game.roll(locked_dice)
+    category = next(name for name, points in game.state.scores.items() if points is None)
+    return bool(game.choose_score(category).finished)
+
+
+def test_replay_from_moves(db, journal):
+    game = Game(db, dice=FastDiceSource(seed=1))
+    game_id = game.start(user_id=1).id
+    while not _play_round(game, [0, 2]):
+        pass
+    live = game.state.to_dict()
+    journal.flush()
+
+    moves = db.query(GameMove).filter(GameMove.game_id == game_id).order_by(GameMove.seq).all()
+    assert [move.seq for move in moves] == list(range(1, len(moves) + 1))
+    state = Game.new_state()
+    assert Game.replay(state, [(move.kind, move.payload) for move in moves])
+    assert state.to_dict() == live
+    assert db.get(GameSession, game_id).state == live
+
+
+def test_reload_replays_pending_moves(db, journal):
+    game = Game(db, dice=FastDiceSource(seed=2))
+    game_id = game.start(user_id=1).id
+    for _ in range(4):
+        _play_round(game, [1, 3])
+    game.roll()
+    live = game.state.to_dict()
+    assert journal.has_pending(game_id)
+
+    # Rechargement hors cache : dernier instantané écrit, puis coups du journal rejoués
+    game_cache.clear()
+    reloaded = Game(db, game_id)
+    assert not journal.has_pending(game_id)
+    assert reloaded.state.to_dict() == live
+    assert reloaded.game.journal_seq == game.game.journal_seq
+    assert db.get(GameSession, game_id).journal_seq < reloaded.game.journal_seq
+
+
+def test_concurrent_move_rejected(db, journal):
+    game = Game(db, dice=FastDiceSource(seed=3))
+    game_id = game.start(user_id=1).id
+    stale = Game(db, game_id)
+    game.roll()
+    with pytest.raises(ValueError):
+        stale.roll()
+
+
+def test_rejected_moves_are_reported(db, journal):
+    game = Game(db, dice=FastDiceSource(seed=4))
+    game_id = game.start(user_id=1).id
+    # Coup n°1 déjà écrit par ailleurs : le coup journalisé porte le même numéro
+    db.add(GameMove(game_id=game_id, seq=1, kind="roll", payload={"locked_dice": None, "rolled": [1, 1, 1, 1, 1]}))
+    db.commit()
+    game.roll()
+    journal.flush()
+
+    assert game_cache.peek(game_id) is None
+    with pytest.raises(ValueError, match="could not be saved"):
+        game.roll()
+    # Signalé une seule fois : la partie repart de l'état en base
+    reloaded = Game(db, game_id)
+    assert reloaded.state.dice_values == [1, 1, 1, 1, 1]
+    reloaded.roll([0, 1, 2, 3, 4])
+    journal.flush()
+    assert db.query(GameMove).filter(GameMove.game_id == game_id).count() == 2
+
+
+def test_journal_requires_single_worker():
+    with pytest.raises(ValueError):
+        Settings(journal_enabled=True, ws_broker="unix")
@@ -0,0 +1,102 @@
+"""
+Tests de la pagination par curseur `(created_at, id)` des listes de parties et d'utilisateurs
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from core.config import settings
+from db.models import GameSession, User
+from services import game_service, user_service
+from services.dice import FastDiceSource
+from services.game_service import Game
+from services.move_journal import MoveJournal
+from utils.utils import encode_cursor
+
+START = datetime(2026, 1, 1)
+
+
+def _pages(fetch, limit: int) -> list[list]:
+    """
+    Parcourt toutes les pages comme un client : la page suivante part du dernier élément reçu.
+    """
+    pages, cursor = [], None
+    while True:
+        page = fetch(limit=limit, cursor=cursor)
+        pages.append(page)
+        if len(page) < limit:
+            return pages
+        cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    # Dates en double : l'ID départage les éléments créés au même instant
+    db.add_all(
+        User(id=idx, username=f"u{idx}", email=f"u{idx}@test", created_at=START + timedelta(seconds=idx // 3))
+        for idx in range(1, 24)
+    )
+    db.add_all(
+        GameSession(
+            id=idx,
+            user_id=1 if idx % 4 else 2,
+            state=Game.new_state().to_dict(),
+            finished=idx % 2,
+            total_score=idx,
+            created_at=START + timedelta(minutes=idx // 3),
+        )
+        for idx in range(1, 41)
+    )
+    db.commit()
+    yield db
+    db.close()
+
+
+def test_game_pages_cover_listing_once(db):
+    listed = Game.list_for_user(db, 1)
+    ids = [game.id for game in listed]
+    assert ids == sorted((idx for idx in range(1, 41) if idx % 4), key=lambda idx: (idx // 3, idx), reverse=True)
+
+    for limit in (1, 7, 30, 100):
+        pages = _pages(lambda **kwargs: Game.list_for_user(db, 1, **kwargs), limit)
+        assert [game.id for page in pages for game in page] == ids
+        assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_finished_filter_and_state(db):
+    pages = _pages(lambda **kwargs: Game.list_for_user(db, 1, finished=1, include_state=True, **kwargs), 4)
+    games = [game for page in pages for game in page]
+    assert [game.id for game in games] == [game.id for game in Game.list_for_user(db, 1) if game.finished]
+    assert all(game.state == Game.new_state().to_dict() for game in games)
+    assert not hasattr(Game.list_for_user(db, 1, limit=1)[0], "state")
+
+
+def test_invalid_cursor(db):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        Game.list_for_user(db, 1, cursor="not a cursor")
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        user_service.list_users(db, cursor="bm90fGEgY3Vyc29y")
+
+
+def test_user_pages_cover_listing_once(db):
+    ids = [user.id for user in user_service.list_users(db)]
+    assert ids == sorted(range(1, 24), key=lambda idx: (idx // 3, idx), reverse=True)
+    pages = _pages(lambda **kwargs: user_service.list_users(db, **kwargs), 5)
+    assert [user.id for page in pages for user in page] == ids
+
+
+def test_listing_shows_moves_not_yet_written(db, session_factory, monkeypatch):
+    journal = MoveJournal(session_factory, flush_interval=1.0, max_pending=1000)
+    monkeypatch.setattr(game_service, "move_journal", journal)
+    monkeypatch.setattr(settings, "journal_enabled", True)
+    monkeypatch.setattr(settings, "journal_snapshot_every", 1000)
+    game = Game(db, 2, dice=FastDiceSource(seed=1))
+    game.roll()
+    game.choose_score("chance")
+
+    listed = next(row for row in Game.list_for_user(db, 1, include_state=True) if row.id == 2)
+    assert listed.total_score == sum(game.state.dice_values)
+    assert listed.state["scores"]["chance"] == listed.total_score
+    assert db.get(GameSession, 2).total_score == 2
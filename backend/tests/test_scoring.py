@@ -0,0 +1,58 @@
+"""
+Tests du calcul des scores : table précalculée et calcul en bloc comparés aux règles
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from services.game_service import CategoriesEnum, Game
+
+CATEGORIES = [category.value for category in CategoriesEnum]
+# Tous les lancers possibles (6^5), dans l'ordre des dés
+ALL_ROLLS = np.array(list(itertools.product(range(1, 7), repeat=5)))
+
+
+def test_score_batch_matches_rules():
+    scores = Game.score_batch(ALL_ROLLS)
+    assert scores.shape == (len(ALL_ROLLS), len(CATEGORIES))
+    for dice, row in zip(ALL_ROLLS.tolist(), scores.tolist()):
+        assert row == [Game._compute_score_for_category(category, dice) for category in CATEGORIES], dice
+
+
+@pytest.mark.parametrize("category", CATEGORIES)
+def test_score_batch_single_category(category):
+    expected = [Game._compute_score_for_category(category, dice) for dice in ALL_ROLLS.tolist()]
+    assert Game.score_batch(ALL_ROLLS, category).tolist() == expected
+
+
+def test_score_table_matches_rules():
+    for dice in ALL_ROLLS.tolist():
+        for category in CATEGORIES:
+            assert Game._calculate_score_for_category(category, dice) == Game._compute_score_for_category(category, dice)
+
+
+def test_score_batch_invalid_input():
+    with pytest.raises(ValueError):
+        Game.score_batch(np.array([[1, 2, 3, 4]]))
+    with pytest.raises(ValueError):
+        Game.score_batch(np.array([[0, 2, 3, 4, 5]]))
+    with pytest.raises(ValueError):
+        Game.score_batch(ALL_ROLLS[:3], "bonus")
+
+
+
+@pytest.mark.parametrize(
+    "dice",
+    [
+        [[1, 2, 3, 4, 7]],
+        [[-1, 2, 3, 4, 5]],
+        [[1.5, 2, 3, 4, 5]],
+        [[1.0, 2.0, 3.0, 4.0, 5.0]],
+        [["1", "2", "3", "4", "5"]],
+    ],
+)
+def test_score_batch_rejects_values_off_the_table(dice):
+    with pytest.raises(ValueError):
+        Game.score_batch(np.array(dice))
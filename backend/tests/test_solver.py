@@ -0,0 +1,108 @@
+"""
+Tests du solveur : espérances de la table et conseils donnés sur quelques positions connues
+"""
+
+import numpy as np
+import pytest
+
+from core.config import settings
+from services import solver as solver_module
+from services.game_service import CATEGORIES, Game
+from services.runtime_state import RuntimeGameState
+from services.solver import _HEADER, FULL_MASK, TABLE_MAGIC, Solver, load_future_values, open_mask, save_future_values
+
+
+@pytest.fixture(scope="module")
+def solver() -> Solver:
+    return Solver.build()
+
+
+def _state(dice: list[int], rolls_left: int, open_categories: list[str]) -> RuntimeGameState:
+    """
+    État en cours de tour où seules les catégories données sont libres (les autres valent 0).
+    """
+    scores = {category: None if category in open_categories else 0 for category in CATEGORIES}
+    return RuntimeGameState(dice, rolls_left, 13 - len(open_categories), scores, 0)
+
+
+def test_chance_expectation(solver):
+    # Chance seule : chaque dé vaut 14/3 avec deux relances (garder 5 et 6, puis 4 à 6), soit 70/3 pour cinq dés
+    assert solver.future[1 << CATEGORIES.index("chance")] == pytest.approx(70 / 3)
+    assert solver.future[0] == 0
+
+
+def test_more_open_categories_score_more(solver):
+    for idx in range(len(CATEGORIES)):
+        assert solver.future[FULL_MASK] > solver.future[FULL_MASK & ~(1 << idx)]
+
+
+def test_hint_rolls_at_turn_start(solver):
+    state = Game.new_state()
+    hint = solver.best_action(state)
+    assert hint.action == "roll"
+    assert hint.locked_dice == []
+    assert hint.expected_score == pytest.approx(solver.future[open_mask(state.scores)])
+
+
+def test_hint_scores_yahtzee(solver):
+    hint = solver.best_action(_state([6, 6, 6, 6, 6], 2, list(CATEGORIES)))
+    assert hint.action == "score"
+    assert hint.category == "yahtzee"
+
+
+def test_hint_keeps_high_dice_for_chance(solver):
+    # Dernière relance pour la chance : on garde les dés d'au moins 4 (espérance d'un dé relancé 3,5)
+    hint = solver.best_action(_state([1, 6, 3, 4, 2], 1, ["chance"]))
+    assert hint.action == "roll"
+    assert hint.locked_dice == [1, 3]
+    assert hint.expected_score == pytest.approx(6 + 4 + 3 * 3.5)
+
+
+def test_hint_scores_without_rolls_left(solver):
+    hint = solver.best_action(_state([2, 3, 4, 5, 1], 0, ["large_straight", "ones"]))
+    assert hint.action == "score"
+    assert hint.category == "large_straight"
+
+
+def test_hint_rejects_invalid_states(solver):
+    with pytest.raises(ValueError, match="finished"):
+        solver.best_action(_state([1, 1, 1, 1, 1], 0, []))
+    with pytest.raises(ValueError, match="rolled"):
+        solver.best_action(_state([0, 0, 0, 0, 0], 2, ["chance"]))
+
+
+# ----------------------------------------------------------------------
+# Table persistée
+# ----------------------------------------------------------------------
+
+
+def test_table_round_trip(solver, tmp_path):
+    path = str(tmp_path / "strategy.bin")
+    save_future_values(path, solver.future)
+    loaded = load_future_values(path)
+    assert isinstance(loaded, np.memmap)
+    assert not loaded.flags.writeable
+    assert np.array_equal(loaded, solver.future)
+
+
+def test_table_for_other_rules_is_rejected(solver, tmp_path):
+    path = tmp_path / "strategy.bin"
+    save_future_values(str(path), solver.future)
+    data = bytearray(path.read_bytes())
+    data[len(TABLE_MAGIC)] ^= 0xFF
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="different scoring rules"):
+        load_future_values(str(path))
+
+    path.write_bytes(_HEADER.pack(b"NOTATABL", bytes(32), FULL_MASK + 1))
+    with pytest.raises(ValueError, match="Invalid strategy table"):
+        load_future_values(str(path))
+
+
+def test_invalid_table_is_rebuilt(solver, tmp_path, monkeypatch):
+    path = tmp_path / "strategy.bin"
+    path.write_bytes(_HEADER.pack(b"NOTATABL", bytes(32), FULL_MASK + 1))
+    monkeypatch.setattr(settings, "strategy_table_path", str(path))
+    rebuilt = solver_module._load_or_build()
+    assert not isinstance(rebuilt.future, np.memmap)
+    assert np.array_equal(rebuilt.future, solver.future)
@@ -0,0 +1,54 @@
+"""
+Tests de l'encodage compact de l'état d'une partie
+"""
+
+import pytest
+
+from db.schemas import GameState
+from services.dice import FastDiceSource
+from services.game_service import Game
+from utils import state_codec
+
+
+def _states():
+    """
+    États rencontrés au cours de parties jouées au hasard (début, lancers, fin de partie).
+    """
+    dice = FastDiceSource(seed=7)
+    for _ in range(20):
+        state = Game.new_state()
+        yield state.to_dict()
+        while True:
+            Game.apply_roll(state, None, dice)
+            Game.apply_roll(state, [0, 2], dice)
+            yield state.to_dict()
+            category = next(name for name, points in state.scores.items() if points is None)
+            finished = Game.apply_score(state, category)
+            yield state.to_dict()
+            if finished:
+                break
+
+
+def test_round_trip():
+    for state in _states():
+        data = state_codec.encode_dict(state)
+        assert len(data) == state_codec.STATE_SIZE
+        assert state_codec.unpack(data) == {**state, "locked_dice": sorted(set(state["locked_dice"]))}
+
+
+def test_encode_decode_game_state():
+    for state in _states():
+        game_state = GameState(**state)
+        assert state_codec.decode(state_codec.encode(game_state)) == game_state
+
+
+def test_invalid_values():
+    state = Game.new_state().to_dict()
+    with pytest.raises(ValueError):
+        state_codec.encode_dict({**state, "dice_values": [7, 1, 1, 1, 1]})
+    with pytest.raises(ValueError):
+        state_codec.encode_dict({**state, "rolls_left": 4})
+    with pytest.raises(ValueError):
+        state_codec.encode_dict({**state, "scores": {}})
+    with pytest.raises(ValueError):
+        state_codec.unpack(state_codec.encode_dict(state)[:-1])
@@ -0,0 +1,38 @@
+"""
+Tests de la compaction de la télémétrie en fichiers d'archive
+"""
+
+from db.models import TelemetrySample, User
+from services import telemetry_archive
+
+DAY = telemetry_archive.DAY
+
+
+def test_compact_keeps_samples_written_during_compaction(session_factory, tmp_path, monkeypatch):
+    db = session_factory()
+    db.add(User(id=1, username="t", email="t@t"))
+    db.commit()
+    day = 19000
+    db.add_all(
+        TelemetrySample(user_id=1, metric="speed", timestamp=day * DAY + second, value=float(second))
+        for second in range(10)
+    )
+    db.commit()
+
+    write_day = telemetry_archive.write_day
+
+    def write_day_then_flush(path, timestamps, values):
+        # Lot écrit par le serveur pendant la compaction, dans le jour en cours d'archivage
+        write_day(path, timestamps, values)
+        with session_factory() as other:
+            other.add(TelemetrySample(user_id=1, metric="speed", timestamp=day * DAY + 50, value=50.0))
+            other.commit()
+
+    monkeypatch.setattr(telemetry_archive, "write_day", write_day_then_flush)
+    assert telemetry_archive.compact(db, (day + 2) * DAY, tmp_path) == 10
+
+    left = db.query(TelemetrySample.timestamp).all()
+    assert left == [(day * DAY + 50,)]
+    timestamps, values = telemetry_archive.read_day(telemetry_archive.day_path(tmp_path, 1, "speed", day))
+    assert values.tolist() == [float(second) for second in range(10)]
+    db.close()
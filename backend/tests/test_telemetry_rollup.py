@@ -0,0 +1,97 @@
+"""
+Tests des agrégats de télémétrie : choix du palier et requêtes par intervalle
+"""
+
+import numpy as np
+import pytest
+from sqlalchemy import insert
+
+from core.config import settings
+from db.models import TelemetrySample, User
+from services.telemetry_rollup import (
+    DEFAULT_POINTS,
+    ROLLUP_TIERS,
+    choose_tier,
+    default_resolution,
+    query_range,
+    upsert_rollups,
+)
+
+START = 1_700_000_000.0
+
+
+@pytest.mark.parametrize(
+    "resolution, tier", [(0.5, None), (1.5, None), (1, 1), (5, 1), (60, 60), (120, 60), (90, 1), (7200, 3600)]
+)
+def test_choose_tier(resolution, tier):
+    assert choose_tier(resolution) == tier
+
+
+@pytest.mark.parametrize("span", [10, 400, 600, 3600, 3 * 3600, 86400, 86400 * 30, 86400 * 365])
+def test_default_resolution_uses_a_tier(span):
+    start = 1_700_000_007.0
+    resolution = default_resolution(start, start + span)
+    assert span / resolution <= DEFAULT_POINTS
+    if span / DEFAULT_POINTS >= ROLLUP_TIERS[0]:
+        assert choose_tier(resolution) is not None
+    else:
+        assert resolution == span / DEFAULT_POINTS
+
+
+@pytest.fixture
+def samples(session_factory):
+    """
+    Trois heures d'échantillons d'un utilisateur, en base et dans les agrégats (en deux lots fusionnés).
+    """
+    rng = np.random.default_rng(0)
+    timestamps = START + np.sort(rng.uniform(0, 3 * 3600, 5000))
+    values = rng.normal(20, 5, len(timestamps))
+    db = session_factory()
+    db.add(User(id=1, username="t", email="t@t"))
+    db.commit()
+    db.execute(
+        insert(TelemetrySample),
+        [{"user_id": 1, "metric": "speed", "timestamp": t, "value": v} for t, v in zip(timestamps, values)],
+    )
+    for part in np.array_split(np.arange(len(timestamps)), 2):
+        ones = np.ones(len(part), dtype=np.int64)
+        upsert_rollups(db, ones, ones * 0, timestamps[part], values[part], ["speed"])
+    db.commit()
+    yield db, timestamps, values
+    db.close()
+
+
+def _brute_force(timestamps, values, start, end, resolution):
+    first, last = np.floor(start / resolution) * resolution, np.ceil(end / resolution) * resolution
+    selected = (timestamps >= first) & (timestamps < last)
+    buckets = np.floor(timestamps[selected] / resolution) * resolution
+    return {
+        bucket: (len(group), group.min(), group.max(), group.sum(), group[-1])
+        for bucket in np.unique(buckets)
+        for group in [values[selected][buckets == bucket]]
+    }
+
+
+@pytest.mark.parametrize("resolution, tier", [(0.5, None), (7, 1), (120, 60), (600, 60), (3600, 3600)])
+def test_query_range_matches_samples(samples, tmp_path, monkeypatch, resolution, tier):
+    db, timestamps, values = samples
+    monkeypatch.setattr(settings, "telemetry_archive_path", str(tmp_path))
+    start, end = START + 95, START + (95 + 600 if resolution < 1 else 2 * 3600)
+    used, buckets = query_range(db, 1, "speed", start, end, resolution)
+    assert used == tier
+    expected = _brute_force(timestamps, values, start, end, resolution)
+    assert buckets.bucket.tolist() == sorted(expected)
+    for row in zip(buckets.bucket, buckets.count, buckets.min, buckets.max, buckets.sum, buckets.last):
+        assert np.allclose(row[1:], expected[row[0]])
+
+
+@pytest.mark.parametrize("resolution", [1.5, 3600.5])
+def test_query_range_rejects_resolution_off_tiers(samples, resolution):
+    with pytest.raises(ValueError):
+        query_range(samples[0], 1, "speed", START, START + 3600, resolution)
+
+
+def test_query_range_rejects_long_scan_of_a_fine_tier(samples):
+    # 3599 s est servi par le palier de 1 s : 400 jours demanderaient 35 millions d'agrégats
+    with pytest.raises(ValueError, match="multiple of 60s"):
+        query_range(samples[0], 1, "speed", START, START + 400 * 86400, 3599)
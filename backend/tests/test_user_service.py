@@ -0,0 +1,69 @@
+"""
+Tests de la création et de la suppression groupées d'utilisateurs
+"""
+
+import pytest
+
+from core.config import settings
+from db.models import GameMove, GameSession, TelemetrySample, User
+from db.schemas import UserCreate
+from services import user_service
+from services.dice import FastDiceSource
+from services.game_cache import game_cache
+from services.game_service import Game
+from services.leaderboard_service import Leaderboard
+
+
+@pytest.fixture
+def db(session_factory, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "journal_enabled", False)
+    monkeypatch.setattr(settings, "telemetry_archive_path", str(tmp_path / "archive"))
+    monkeypatch.setattr(user_service, "leaderboard", Leaderboard(session_factory, top_size=10))
+    db = session_factory()
+    yield db
+    db.close()
+
+
+def _users(count: int, prefix: str = "bulk") -> list[UserCreate]:
+    return [UserCreate(username=f"{prefix}{idx}", email=f"{prefix}{idx}@test") for idx in range(count)]
+
+
+def test_create_users_keeps_order(db):
+    created = user_service.create_users(db, _users(50))
+    assert [user.username for user in created] == [f"bulk{idx}" for idx in range(50)]
+    assert all(user.id is not None and user.created_at is not None for user in created)
+    assert db.query(User).count() == 50
+    assert user_service.create_users(db, []) == []
+
+
+def test_bulk_limit(db, monkeypatch):
+    monkeypatch.setattr(user_service, "BULK_LIMIT", 3)
+    with pytest.raises(ValueError):
+        user_service.create_users(db, _users(4))
+    with pytest.raises(ValueError):
+        user_service.delete_users(db, [1, 2, 3, 4])
+    assert db.query(User).count() == 0
+
+
+def test_delete_users_cascades(db, tmp_path):
+    users = user_service.create_users(db, _users(3))
+    game_ids = {}
+    for user in users:
+        game = Game(db, dice=FastDiceSource(seed=user.id))
+        game_ids[user.id] = game.start(user.id).id
+        game.roll()
+        db.add(GameMove(game_id=game.game_id, seq=1, kind="roll", payload={"locked_dice": None, "rolled": [1] * 5}))
+        db.add(TelemetrySample(user_id=user.id, metric="speed", timestamp=0.0, value=1.0))
+        (tmp_path / "archive" / str(user.id)).mkdir(parents=True)
+    db.commit()
+
+    removed, kept = [users[0].id, users[2].id], users[1].id
+    # Les IDs inconnus sont ignorés
+    assert user_service.delete_users(db, removed + [9999]) == 2
+
+    assert [user.id for user in db.query(User)] == [kept]
+    assert [game.user_id for game in db.query(GameSession)] == [kept]
+    assert [move.game_id for move in db.query(GameMove)] == [game_ids[kept]]
+    assert [sample.user_id for sample in db.query(TelemetrySample)] == [kept]
+    assert sorted(path.name for path in (tmp_path / "archive").iterdir()) == [str(kept)]
+    assert [user_id for user_id, game_id in game_ids.items() if game_cache.peek(game_id)] == [kept]
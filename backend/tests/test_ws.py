@@ -0,0 +1,31 @@
+"""
+Tests de la diffusion des coups aux connexions WebSocket
+"""
+
+from datetime import datetime
+import json
+
+from api import ws
+from db.schemas import GameRead
+from services.game_cache import CachedGame
+from services.game_service import Game
+
+
+def _game() -> CachedGame:
+    return CachedGame(7, 1, datetime(2026, 1, 2, 3, 4, 5, 678), Game.new_state().to_dict(), 0, 3)
+
+
+def test_game_message_matches_schema():
+    game = _game()
+    assert json.loads(ws.game_message(game)) == json.loads(GameRead.model_validate(game).model_dump_json())
+
+
+def test_push_skips_games_without_subscribers(monkeypatch):
+    published = []
+    monkeypatch.setattr(ws.broker, "publish", lambda room, message: published.append((room, message)))
+    ws.push_game_move("roll", _game())
+    assert published == []
+
+    monkeypatch.setattr(ws.manager, "has_subscribers", lambda room: room == 7)
+    ws.push_game_move("roll", _game())
+    assert [room for room, _ in published] == [7]
@@ -0,0 +1,194 @@
+"""
+Fichier de définition des métriques de l'application (histogrammes) et de leur export au format texte Prometheus
+"""
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Optional, Sequence
+import threading
+import time
+
+from sqlalchemy import event
+
+from core.config import settings
+
+# Bornes des histogrammes de durée, en secondes
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)  # fmt: skip
+# Bornes des histogrammes de nombre de requêtes SQL par requête HTTP
+COUNT_BUCKETS: tuple[float, ...] = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """
+    Histogramme Prometheus à bornes fixes, une série par combinaison de valeurs des étiquettes.
+    Les valeurs sont propres au processus : chaque worker expose les siennes.
+    """
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str], buckets: Sequence[float]):
+        """
+        :param labels: Noms des étiquettes, valeurs passées dans le même ordre à `observe`
+        :param buckets: Bornes supérieures croissantes (la borne `+Inf` est implicite)
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        # valeurs d'étiquettes -> [effectifs par borne (non cumulés, +Inf en dernier), somme]
+        self._series: dict[tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> list[str]:
+        """
+        Lignes de l'histogramme au format texte Prometheus (`_bucket` cumulés, `_sum`, `_count`).
+        """
+        with self._lock:
+            series = [(label_values, list(counts), total) for label_values, (counts, total) in self._series.items()]
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for label_values, counts, total in sorted(series):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labels, label_values)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{float(bound)!r}"'
+                lines.append(f"{self.name}_bucket{_labels(pairs + [le])} {cumulative}")
+            suffix = _labels(pairs)
+            lines.append(f"{self.name}_sum{suffix} {repr(float(total))}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+def _labels(pairs: list[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ----------------------------------------------------------------------
+# Métriques de l'application
+# ----------------------------------------------------------------------
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP, par route",
+    ("method", "route", "status"),
+    LATENCY_BUCKETS,
+)
+http_request_db_queries = Histogram(
+    "http_request_db_queries",
+    "Nombre de requêtes SQL exécutées par requête HTTP",
+    ("method", "route"),
+    COUNT_BUCKETS,
+)
+http_request_db_duration = Histogram(
+    "http_request_db_duration_seconds",
+    "Temps passé dans la base de données par requête HTTP",
+    ("method", "route"),
+    LATENCY_BUCKETS,
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds",
+    "Durée des requêtes SQL (requêtes HTTP et threads de fond), par type d'instruction",
+    ("statement",),
+    LATENCY_BUCKETS,
+)
+game_method_duration = Histogram(
+    "game_method_duration_seconds",
+    "Durée des méthodes de `Game`",
+    ("method",),
+    LATENCY_BUCKETS,
+)
+
+REGISTRY: tuple[Histogram, ...] = (
+    http_request_duration,
+    http_request_db_queries,
+    http_request_db_duration,
+    db_query_duration,
+    game_method_duration,
+)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def render() -> str:
+    """
+    Export de toutes les métriques au format texte Prometheus.
+    """
+    return "\n".join(line for histogram in REGISTRY for line in histogram.render()) + "\n"
+
+
+# ----------------------------------------------------------------------
+# Requêtes SQL de la requête HTTP en cours
+# ----------------------------------------------------------------------
+
+
+class QueryStats:
+    """
+    Compteurs SQL d'une requête HTTP, partagés par référence avec les threads (`to_thread`) et
+    greenlets (`run_sync`) qui héritent du contexte de la requête.
+    """
+
+    __slots__ = ("count", "duration")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info["query_started"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - conn.info.pop("query_started", time.perf_counter())
+    db_query_duration.observe(duration, statement.split(None, 1)[0].upper() if statement.strip() else "")
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.duration += duration
+
+
+def instrument_engine(engine) -> None:
+    """
+    Mesure chaque requête SQL du moteur (synchrone, ou `sync_engine` d'un moteur asynchrone).
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def timed(histogram: Histogram, *label_values: str) -> Callable:
+    """
+    Décorateur qui mesure la durée de chaque appel dans `histogram` (sans effet si `METRICS_ENABLED` est faux).
+    """
+
+    def decorator(function: Callable) -> Callable:
+        if not settings.metrics_enabled:
+            return function
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, *label_values)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,128 @@
+"""
+Fichier des outils de profilage à chaud : cProfile (rapport pstats) et échantillonnage des piles (format replié)
+"""
+
+from collections import Counter
+from typing import Optional
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+
+# Formats de sortie : "pstats" (binaire, lisible par `pstats.Stats` / snakeviz), "text" (rapport pstats trié
+# par temps cumulé) et "collapsed" (une pile par ligne `a;b;c nombre`, entrée de flamegraph.pl / speedscope)
+PROFILE_FORMATS = ("pstats", "text", "collapsed")
+PROFILE_MEDIA_TYPES = {
+    "pstats": "application/octet-stream",
+    "text": "text/plain; charset=utf-8",
+    "collapsed": "text/plain; charset=utf-8",
+}
+
+# Un seul profilage à la fois par processus (cProfile ne peut pas être imbriqué)
+profiling_lock = threading.Lock()
+
+
+# ----------------------------------------------------------------------
+# cProfile
+# ----------------------------------------------------------------------
+
+
+def pstats_report(profile: cProfile.Profile, fmt: str, limit: int = 60) -> bytes:
+    """
+    Sortie d'un profil cProfile arrêté au format `pstats` (même contenu que `dump_stats`) ou `text`.
+    """
+    if fmt == "pstats":
+        profile.create_stats()
+        return marshal.dumps(profile.stats)
+    stream = io.StringIO()
+    pstats.Stats(profile, stream=stream).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return stream.getvalue().encode()
+
+
+# ----------------------------------------------------------------------
+# Échantillonnage des piles
+# ----------------------------------------------------------------------
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+def _thread_cpu_time(thread_id: int) -> Optional[float]:
+    """
+    Temps CPU consommé par un thread, ou `None` si la plateforme ne le fournit pas.
+    """
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(thread_id))
+    except (AttributeError, OSError):
+        return None
+
+
+class StackSampler:
+    """
+    Relève périodiquement les piles des threads du processus depuis un thread dédié (`sys._current_frames`),
+    sans instrumenter le code profilé : le coût est proportionnel à la fréquence, pas au nombre d'appels.
+
+    Un thread dont le temps CPU n'a pas avancé depuis le relevé précédent attend (verrou, file, E/S) et
+    n'est pas relevé ; un thread dans du code C qui libère le GIL (requête SQLite) l'est bien.
+    Pendant l'échantillonnage, l'intervalle de bascule du GIL est ramené à la période d'échantillonnage :
+    sinon l'échantillonneur ne reprend la main que lorsque les autres threads attendent (toutes les 5 ms
+    au mieux) et ne relève presque que des piles inactives.
+    """
+
+    def __init__(self, interval: float, thread_ids: Optional[set[int]] = None):
+        """
+        :param interval: Période d'échantillonnage en secondes
+        :param thread_ids: Threads échantillonnés (tous sauf l'échantillonneur par défaut)
+        """
+        self.interval = interval
+        self.thread_ids = thread_ids
+        self.stacks: Counter[str] = Counter()
+        self._cpu: dict[int, Optional[float]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._switch_interval = sys.getswitchinterval()
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == threading.get_ident() or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                continue
+            cpu = _thread_cpu_time(thread_id)
+            previous, self._cpu[thread_id] = self._cpu.get(thread_id), cpu
+            if cpu is not None and (previous is None or cpu <= previous):
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame))
+                frame = frame.f_back
+            labels.append(names.get(thread_id, str(thread_id)))
+            self.stacks[";".join(reversed(labels))] += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            sys.setswitchinterval(self._switch_interval)
+
+    def collapsed(self) -> bytes:
+        """
+        Piles relevées au format replié, la plus fréquente en premier.
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()).encode()
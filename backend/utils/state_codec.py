@@ -0,0 +1,110 @@
+"""
+Fichier d'encodage compact de l'état d'une partie (stockage et échanges WebSocket)
+"""
+
+from typing import Mapping, Optional, Sequence
+
+from db.schemas import GameState
+
+# Format (18 octets) :
+#   octet     0  : version du format
+#   octets  1-4  : entier de 26 bits en little-endian
+#                  bits 0-14 : 5 dés sur 3 bits (0 = pas encore lancé), bits 15-19 : masque des dés
+#                  verrouillés, bits 20-21 : lancers restants (0..3), bits 22-25 : tour (0..13)
+#   octets 5-17  : 13 scores sur un octet, `NULL_SCORE` pour une catégorie libre
+# Les scores restent alignés sur l'octet : encodage et décodage se font par `bytes`/`map` sans boucle Python.
+# `total_score` n'est pas stocké : c'est la somme des scores marqués.
+FORMAT_VERSION = 1
+STATE_SIZE = 18
+STATE_MEDIA_TYPE = "application/vnd.yahtzee.state"
+NULL_SCORE = 255
+
+# Ordre des catégories dans le format, figé indépendamment de `CategoriesEnum`
+CATEGORY_ORDER: tuple[str, ...] = (
+    "ones",
+    "twos",
+    "threes",
+    "fours",
+    "fives",
+    "sixes",
+    "three_of_a_kind",
+    "four_of_a_kind",
+    "full_house",
+    "small_straight",
+    "large_straight",
+    "yahtzee",
+    "chance",
+)
+
+
+# Conversions octet <-> score, `None` pour une catégorie libre
+_SCORE_TO_BYTE: dict[Optional[int], int] = {None: NULL_SCORE, **{points: points for points in range(NULL_SCORE)}}
+_BYTE_TO_SCORE: tuple[Optional[int], ...] = tuple(range(NULL_SCORE)) + (None,)
+
+
+def pack(
+    dice_values: Sequence[int],
+    locked_dice: Sequence[int],
+    rolls_left: int,
+    round: int,
+    scores: Mapping[str, Optional[int]],
+) -> bytes:
+    """
+    Encode les champs d'un état de partie.
+
+    :raises ValueError: Si une valeur sort des bornes du format
+    """
+    d0, d1, d2, d3, d4 = dice_values
+    if not (0 <= d0 <= 6 and 0 <= d1 <= 6 and 0 <= d2 <= 6 and 0 <= d3 <= 6 and 0 <= d4 <= 6):
+        raise ValueError("Invalid dice values")
+    if not 0 <= rolls_left <= 3 or not 0 <= round <= len(CATEGORY_ORDER):
+        raise ValueError("Invalid rolls_left or round")
+    mask = 0
+    for idx in locked_dice:
+        if 0 <= idx < 5:
+            mask |= 1 << idx
+    header = d0 | d1 << 3 | d2 << 6 | d3 << 9 | d4 << 12 | mask << 15 | rolls_left << 20 | round << 22
+    try:
+        points = bytes(map(_SCORE_TO_BYTE.__getitem__, map(scores.__getitem__, CATEGORY_ORDER)))
+    except KeyError as e:
+        raise ValueError("Invalid or missing score") from e
+    return bytes((FORMAT_VERSION,)) + header.to_bytes(4, "little") + points
+
+
+def unpack(data: bytes) -> dict:
+    """
+    Décode un état encodé par `pack` sous forme de dictionnaire (format de `GameSession.state`).
+
+    :raises ValueError: Si les données ne sont pas au format attendu
+    """
+    if len(data) != STATE_SIZE or data[0] != FORMAT_VERSION:
+        raise ValueError("Invalid packed game state")
+    header = int.from_bytes(data[1:5], "little")
+    scores = dict(zip(CATEGORY_ORDER, map(_BYTE_TO_SCORE.__getitem__, data[5:])))
+    mask = header >> 15 & 0x1F
+    return {
+        "dice_values": [header & 7, header >> 3 & 7, header >> 6 & 7, header >> 9 & 7, header >> 12 & 7],
+        "rolls_left": header >> 20 & 3,
+        "round": header >> 22 & 0xF,
+        "scores": scores,
+        "total_score": sum(filter(None, scores.values())),
+        "locked_dice": [idx for idx in range(5) if mask >> idx & 1],
+    }
+
+
+def encode(state: GameState) -> bytes:
+    """
+    Encode un `GameState` (ou un `RuntimeGameState`). Les dés verrouillés sont normalisés en index triés et uniques.
+    """
+    return pack(state.dice_values, state.locked_dice, state.rolls_left, state.round, state.scores)
+
+
+def decode(data: bytes) -> GameState:
+    return GameState(**unpack(data))
+
+
+def encode_dict(state: Mapping) -> bytes:
+    """
+    Encode un état au format dictionnaire de `GameSession.state`.
+    """
+    return pack(state["dice_values"], state.get("locked_dice", ()), state["rolls_left"], state["round"], state["scores"])
@@ -0,0 +1,29 @@
+"""
+Fichier de fonctions utilitaires partagées
+"""
+
+from datetime import datetime
+import base64
+
+# En-tête de réponse des listes paginées portant le curseur de la page suivante
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """
+    Encode la position `(created_at, id)` du dernier élément d'une page en curseur opaque.
+    """
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{id}".encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Décode un curseur produit par `encode_cursor`.
+
+    :raises ValueError: Si le curseur est invalide
+    """
+    try:
+        created_at, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
@@ -1,7 +1,7 @@
 "use client";
 
 import { useState } from "react";
-import { User, Game } from "@/types/game";
+import { User, Game, GameSummary } from "@/types/game";
 import { Button } from "@/components/ui/button";
 import { Card } from "@/components/ui/card";
 import { api } from "@/lib/api";
@@ -47,8 +47,13 @@ export default function Home() {
     refetchGames();
   };
 
-  const handleLoadGame = (game: Game) => {
-    setCurrentGame(game);
+  const handleLoadGame = async (game: GameSummary) => {
+    try {
+      setCurrentGame(await api.getGame(game.id));
+    } catch (error) {
+      console.error(error);
+      toast.error("Erreur lors du chargement de la partie");
+    }
   };
 
   const handleChangeUser = () => {
@@ -128,7 +133,7 @@ export default function Home() {
                       Game #{game.id} - {game.finished ? "Finished" : "In Progress"}
                     </div>
                     <div className="text-sm text-muted-foreground">
-                      Round {game.state.round + 1}/13 • Score: {game.state.total_score}
+                      Score: {game.total_score}
                     </div>
                   </div>
                   <div className="text-sm">
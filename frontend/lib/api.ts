@@ -1,6 +1,23 @@
-import { User, Game } from '@/types/game';
+import { User, Game, GameSummary } from '@/types/game';
 
 const API_BASE_URL = 'http://localhost:8000';
+// Paginated lists return the cursor of the next page in this header (absent on the last page)
+const NEXT_CURSOR_HEADER = 'X-Next-Cursor';
+const PAGE_SIZE = 500;
+
+async function fetchAllPages<T>(path: string, errorMessage: string): Promise<T[]> {
+  const items: T[] = [];
+  const separator = path.includes('?') ? '&' : '?';
+  let cursor: string | null = null;
+  do {
+    const query = `limit=${PAGE_SIZE}` + (cursor ? `&cursor=${encodeURIComponent(cursor)}` : '');
+    const response = await fetch(`${API_BASE_URL}${path}${separator}${query}`);
+    if (!response.ok) throw new Error(errorMessage);
+    items.push(...(await response.json()));
+    cursor = response.headers.get(NEXT_CURSOR_HEADER);
+  } while (cursor);
+  return items;
+}
 
 export const api = {
   // User endpoints
@@ -24,9 +41,7 @@ export const api = {
   },
 
   async listUsers(): Promise<User[]> {
-    const response = await fetch(`${API_BASE_URL}/user`);
-    if (!response.ok) throw new Error('Failed to fetch users');
-    return response.json();
+    return fetchAllPages<User>('/user', 'Failed to fetch users');
   },
 
   // Game endpoints
@@ -66,9 +81,7 @@ export const api = {
     return response.json();
   },
 
-  async listUserGames(userId: number): Promise<Game[]> {
-    const response = await fetch(`${API_BASE_URL}/user/${userId}`);
-    if (!response.ok) throw new Error('Failed to fetch user games');
-    return response.json();
+  async listUserGames(userId: number): Promise<GameSummary[]> {
+    return fetchAllPages<GameSummary>(`/user/${userId}`, 'Failed to fetch user games');
   },
 };
@@ -22,6 +22,15 @@ export interface Game {
   finished: number;
 }
 
+// Game as listed by GET /user/{id}: no state, the game is fetched when opened
+export interface GameSummary {
+  id: number;
+  user_id: number;
+  created_at: string;
+  finished: number;
+  total_score: number;
+}
+
 export type ScoreCategory =
   | 'ones' | 'twos' | 'threes' | 'fours' | 'fives' | 'sixes'
   | 'three_of_a_kind' | 'four_of_a_kind' | 'full_house'